@@ -5,14 +5,15 @@ FastAPI server for processing video frames with ML models
 
 import os
 import sys
+import struct
 import asyncio
 import logging
 from typing import List, Dict, Optional
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, UploadFile, File
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, UploadFile, File, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 import numpy as np
 import cv2
@@ -21,9 +22,13 @@ from dotenv import load_dotenv
 # Import processors
 from processors.text_detector import TextDetector
 from processors.nsfw_detector import NSFWDetector
-from processors.object_tracker import ObjectTracker
+from processors.object_tracker import ObjectTracker, TrackerPool
 from processors.audio_profanity import AudioProfanityDetector
 from processors.blur_applicator import BlurApplicator
+from processors.gpu_codec import JpegCodec, VideoStreamDecoder
+from processors.batch_queue import BatchedInferenceQueue
+from processors.cuda_streams import StreamPool
+from session_store import SessionStore
 
 # Load environment variables
 load_dotenv()
@@ -35,6 +40,25 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# WebSocket frame header: frame_id (uint64), detection_count (uint16),
+# has_blur (uint8), jpeg_len (uint32), little-endian, followed by the JPEG bytes
+FRAME_HEADER = struct.Struct('<QHBI')
+
+# Pre-serialized WebSocket text messages (same bytes send_json would produce)
+SKIPPED_FRAME_TEMPLATE = '{"frame_id":%d,"skipped":true}'
+INVALID_FRAME_MESSAGE = '{"error":"Invalid frame"}'
+SESSION_NOT_FOUND_MESSAGE = '{"error":"Session not found"}'
+
+# Maximum frames buffered between WebSocket pipeline stages
+STREAM_QUEUE_SIZE = int(os.getenv('STREAM_QUEUE_SIZE', 2))
+
+# Maximum PCM chunks buffered between an audio upload and transcription
+AUDIO_STREAM_QUEUE_SIZE = int(os.getenv('AUDIO_STREAM_QUEUE_SIZE', 64))
+
+# Frames are downscaled once so their longest side is at most this many
+# pixels before detection and tracking (0 keeps full resolution)
+DETECTION_MAX_SIDE = int(os.getenv('DETECTION_MAX_SIDE', 640))
+
 
 class ProcessingConfig(BaseModel):
     """Configuration for frame processing"""
@@ -47,6 +71,7 @@ class ProcessingConfig(BaseModel):
     audio_confidence: float = 0.8
     profanity_list: List[str] = []
     frame_sample_rate: int = 1
+    detector_stride: int = 5  # Run detectors every Nth processed frame, track in between
 
 
 class DetectionResult(BaseModel):
@@ -63,28 +88,133 @@ class StreamSession:
         self.session_id = session_id
         self.config = config
         self.frame_count = 0
-        self.trackers: Dict = {}
+        self.trackers = TrackerPool()
+        self.video_decoder: Optional[VideoStreamDecoder] = None
+        self.lock = asyncio.Lock()
+
+        # Trackers start empty on this worker (also for sessions rebuilt here
+        # mid-stream), so the first processed frame always runs detectors
+        self._needs_keyframe = True
+
+        # Power-of-two sample rates (including 1) reduce to a bit mask
+        rate = config.frame_sample_rate
+        self._sample_mask = rate - 1 if rate > 0 and rate & (rate - 1) == 0 else None
+
         logger.info(f"[Session {session_id}] Created new stream session")
 
-    def should_process_frame(self) -> bool:
-        """Determine if current frame should be processed based on sample rate"""
-        return self.frame_count % self.config.frame_sample_rate == 0
+    async def next_frame(self) -> Optional[int]:
+        """
+        Advance the shared frame counter and return the new frame id
+
+        Returns None (and evicts the session from this worker) once the
+        session has been deleted, possibly on another worker.
+        """
+        async with self.lock:
+            frame_count = await session_store.incr_frame_count(self.session_id)
+
+            if frame_count is None:
+                active_sessions.pop(self.session_id, None)
+                return None
+
+            self.frame_count = frame_count
+            return frame_count
+
+    def should_process_frame(self, frame_id: int) -> bool:
+        """Determine if a frame should be processed based on sample rate"""
+        if self._sample_mask is not None:
+            return frame_id & self._sample_mask == 0
+        return frame_id % self.config.frame_sample_rate == 0
+
+    def is_keyframe(self, frame_id: int) -> bool:
+        """
+        Determine if detectors should run on a processed frame
+
+        Between keyframes the trackers alone carry detections forward.
+        Without tracking every processed frame is a keyframe.
+        """
+        if not self.config.enable_object_tracking or self.config.detector_stride <= 1:
+            return True
+
+        if self._needs_keyframe:
+            self._needs_keyframe = False
+            return True
+
+        # Frame ids start at 1: processed frames 1, 1 + stride, ... are keyframes
+        processed_index = frame_id // self.config.frame_sample_rate
+        return (processed_index - 1) % self.config.detector_stride == 0
 
 
 # Global state
-active_sessions: Dict[str, StreamSession] = {}
+session_store = SessionStore()
+active_sessions: Dict[str, StreamSession] = {}  # Worker-local session state
 text_detector: Optional[TextDetector] = None
 nsfw_detector: Optional[NSFWDetector] = None
 audio_profanity_detector: Optional[AudioProfanityDetector] = None
 object_tracker: Optional[ObjectTracker] = None
 blur_applicator: Optional[BlurApplicator] = None
+jpeg_codec: Optional[JpegCodec] = None
+nsfw_batcher: Optional[BatchedInferenceQueue] = None
+stream_pool = StreamPool()
+models_ready = False
+model_load_error: Optional[str] = None
+
+
+async def load_processor(name: str, factory, enabled: bool = True):
+    """Construct a processor on a worker thread (None if disabled)"""
+    if not enabled:
+        logger.info(f"{name} disabled (skipped)")
+        return None
+
+    logger.info(f"Loading {name}...")
+    return await asyncio.to_thread(factory)
+
+
+async def load_models(enable_text: bool, enable_nsfw: bool, enable_audio: bool, enable_tracking: bool):
+    """Load all processors concurrently; startup takes the slowest load, not the sum"""
+    global text_detector, nsfw_detector, audio_profanity_detector, object_tracker, blur_applicator, jpeg_codec
+    global nsfw_batcher, models_ready, model_load_error
+
+    try:
+        (
+            text_detector,
+            nsfw_detector,
+            audio_profanity_detector,
+            object_tracker,
+            blur_applicator,
+            jpeg_codec
+        ) = await asyncio.gather(
+            load_processor("Text Detector", TextDetector, enable_text),
+            load_processor("NSFW Detector", NSFWDetector, enable_nsfw),
+            load_processor("Audio Profanity Detector", AudioProfanityDetector, enable_audio),
+            load_processor("Object Tracker", ObjectTracker, enable_tracking),
+            # Always load blur applicator (lightweight, no ML model)
+            load_processor("Blur Applicator", BlurApplicator),
+            # Always load JPEG codec (nvJPEG on GPU, OpenCV fallback)
+            load_processor("JPEG Codec", JpegCodec)
+        )
+
+        # Batch concurrent NSFW requests across sessions
+        if nsfw_detector is not None:
+            nsfw_batcher = BatchedInferenceQueue(nsfw_detector)
+            nsfw_batcher.start()
+
+        # Per-worker CUDA streams so concurrent sessions don't serialize
+        # their GPU work on the default stream
+        stream_pool.start()
+
+        models_ready = True
+
+        loaded_count = sum([enable_text, enable_nsfw, enable_audio, enable_tracking])
+        logger.info(f"ML models loaded successfully ({loaded_count}/4 features enabled)")
+
+    except Exception as e:
+        model_load_error = str(e)
+        logger.error(f"Error during startup: {e}")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize and cleanup ML models"""
-    global text_detector, nsfw_detector, audio_profanity_detector, object_tracker, blur_applicator
-
     # Feature toggles from environment variables
     enable_text = os.getenv('LOAD_TEXT_DETECTOR', 'true').lower() == 'true'
     enable_nsfw = os.getenv('LOAD_NSFW_DETECTOR', 'true').lower() == 'true'
@@ -97,48 +227,25 @@ async def lifespan(app: FastAPI):
     logger.info(f"  Audio Profanity: {enable_audio}")
     logger.info(f"  Object Tracking: {enable_tracking}")
 
-    try:
-        # Initialize processors conditionally
-        if enable_text:
-            logger.info("Loading Text Detector...")
-            text_detector = TextDetector()
-        else:
-            logger.info("Text Detector disabled (skipped)")
-
-        if enable_nsfw:
-            logger.info("Loading NSFW Detector...")
-            nsfw_detector = NSFWDetector()
-        else:
-            logger.info("NSFW Detector disabled (skipped)")
-
-        if enable_audio:
-            logger.info("Loading Audio Profanity Detector...")
-            audio_profanity_detector = AudioProfanityDetector()
-        else:
-            logger.info("Audio Profanity Detector disabled (skipped)")
-
-        if enable_tracking:
-            logger.info("Loading Object Tracker...")
-            object_tracker = ObjectTracker()
-        else:
-            logger.info("Object Tracker disabled (skipped)")
-
-        # Always load blur applicator (lightweight, no ML model)
-        logger.info("Loading Blur Applicator...")
-        blur_applicator = BlurApplicator()
-
-        loaded_count = sum([enable_text, enable_nsfw, enable_audio, enable_tracking])
-        logger.info(f"ML models loaded successfully ({loaded_count}/4 features enabled)")
+    # Shared session store (Redis when configured)
+    await session_store.connect()
 
-        yield
+    # Load models in the background so the server accepts /health and
+    # /ready connections while engines deserialize
+    load_task = asyncio.create_task(
+        load_models(enable_text, enable_nsfw, enable_audio, enable_tracking)
+    )
 
-        # Cleanup
-        logger.info("Shutting down processors...")
-        active_sessions.clear()
+    yield
 
-    except Exception as e:
-        logger.error(f"Error during startup: {e}")
-        raise
+    # Cleanup
+    logger.info("Shutting down processors...")
+    load_task.cancel()
+    await asyncio.gather(load_task, return_exceptions=True)
+    if nsfw_batcher is not None:
+        await nsfw_batcher.stop()
+    active_sessions.clear()
+    await session_store.close()
 
 
 # Create FastAPI app
@@ -146,7 +253,8 @@ app = FastAPI(
     title="RunPod Content Censorship Service",
     description="Real-time video content censorship with ML models",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -165,20 +273,39 @@ app.add_middleware(
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (liveness; answers while models are still loading)"""
+    if model_load_error is not None:
+        status = "failed"
+    else:
+        status = "healthy" if models_ready else "loading"
+
     return {
-        "status": "healthy",
+        "status": status,
+        "error": model_load_error,
         "models_loaded": {
             "text_detector": text_detector is not None,
             "nsfw_detector": nsfw_detector is not None,
             "audio_profanity_detector": audio_profanity_detector is not None,
             "object_tracker": object_tracker is not None,
-            "blur_applicator": blur_applicator is not None
+            "blur_applicator": blur_applicator is not None,
+            "jpeg_codec": jpeg_codec is not None
         },
         "active_sessions": len(active_sessions)
     }
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint: 503 until every enabled model has loaded"""
+    if not models_ready:
+        return ORJSONResponse(
+            status_code=503,
+            content={"ready": False, "error": model_load_error}
+        )
+
+    return {"ready": True}
+
+
 @app.get("/info")
 async def service_info():
     """Get service information"""
@@ -201,28 +328,61 @@ async def service_info():
 # SESSION MANAGEMENT
 # ============================================================================
 
+async def get_session(session_id: str) -> Optional[StreamSession]:
+    """
+    Look up a session, rebuilding worker-local state from the shared store
+
+    Sessions created on another worker get fresh trackers here; sessions
+    deleted elsewhere are evicted from this worker's cache.
+    """
+    session = active_sessions.get(session_id)
+
+    if session is not None:
+        if await session_store.touch(session_id):
+            return session
+
+        del active_sessions[session_id]
+        return None
+
+    config = await session_store.get_config(session_id)
+    if config is None:
+        return None
+
+    session = StreamSession(session_id, ProcessingConfig(**config))
+    active_sessions[session_id] = session
+
+    return session
+
+
 @app.post("/session/create")
 async def create_session(config: ProcessingConfig):
     """Create a new processing session"""
     import uuid
+
+    if not models_ready:
+        raise HTTPException(status_code=503, detail="Models are still loading")
+
     session_id = str(uuid.uuid4())
 
-    session = StreamSession(session_id, config)
-    active_sessions[session_id] = session
+    config_dict = config.model_dump(mode='json')
+
+    await session_store.create(session_id, config_dict)
+    active_sessions[session_id] = StreamSession(session_id, config)
 
     logger.info(f"Created session: {session_id}")
 
     return {
         "session_id": session_id,
-        "config": config.dict()
+        "config": config_dict
     }
 
 
 @app.delete("/session/{session_id}")
 async def delete_session(session_id: str):
     """Delete a processing session"""
-    if session_id in active_sessions:
-        del active_sessions[session_id]
+    active_sessions.pop(session_id, None)
+
+    if await session_store.delete(session_id):
         logger.info(f"Deleted session: {session_id}")
         return {"status": "deleted", "session_id": session_id}
 
@@ -233,88 +393,250 @@ async def delete_session(session_id: str):
 # FRAME PROCESSING ENDPOINTS
 # ============================================================================
 
+def downscale_for_detection(frame: np.ndarray) -> np.ndarray:
+    """Resize a frame once to detection resolution (no-op if already small)"""
+    height, width = frame.shape[:2]
+    longest = max(height, width)
+
+    if DETECTION_MAX_SIDE <= 0 or longest <= DETECTION_MAX_SIDE:
+        return frame
+
+    scale = DETECTION_MAX_SIDE / longest
+    return cv2.resize(
+        frame,
+        (max(1, round(width * scale)), max(1, round(height * scale))),
+        interpolation=cv2.INTER_AREA
+    )
+
+
+def scale_detections(detections: List[Dict], from_shape: tuple, to_shape: tuple) -> List[Dict]:
+    """Map detection boxes from detection resolution back to the full frame"""
+    if from_shape[:2] == to_shape[:2]:
+        return detections
+
+    sx = to_shape[1] / from_shape[1]
+    sy = to_shape[0] / from_shape[0]
+
+    scaled = []
+    for detection in detections:
+        bbox = detection['bbox']
+        vx, vy = detection.get('velocity', (0, 0))
+
+        # Copy so trackers keep their detection-resolution boxes
+        scaled_detection = dict(detection)
+        scaled_detection['bbox'] = {
+            'x': int(bbox['x'] * sx),
+            'y': int(bbox['y'] * sy),
+            'width': int(round(bbox['width'] * sx)),
+            'height': int(round(bbox['height'] * sy))
+        }
+        scaled_detection['velocity'] = (vx * sx, vy * sy)
+        scaled.append(scaled_detection)
+
+    return scaled
+
+
+async def run_detectors(config: ProcessingConfig, frame: np.ndarray) -> List[Dict]:
+    """Run the enabled detectors concurrently and merge their detections"""
+    tasks = []
+
+    if config.enable_text_detection:
+        tasks.append(text_detector.detect(
+            frame,
+            config.text_confidence,
+            config.profanity_list
+        ))
+
+    if config.enable_nsfw_detection:
+        tasks.append(nsfw_batcher.submit(
+            frame,
+            config.nsfw_confidence
+        ))
+
+    # Both detectors offload inference to worker threads, so gathering
+    # lets text and NSFW models run on the GPU at the same time
+    detections = []
+    for results in await asyncio.gather(*tasks):
+        detections.extend(results)
+
+    return detections
+
+
+async def censor_frame(session: StreamSession, frame_id: int, frame: np.ndarray):
+    """
+    Detect, track and blur a decoded frame
+
+    Detection and tracking run on a downscaled copy; only the final blur
+    touches the full-resolution frame. Detectors only run on keyframes.
+
+    Returns:
+        (detections in full-frame coordinates, blurred_frame)
+    """
+    small_frame = downscale_for_detection(frame)
+
+    if session.is_keyframe(frame_id):
+        detections = await run_detectors(session.config, small_frame)
+    else:
+        detections = []
+
+    # Update object trackers (advances existing trackers on non-keyframes)
+    if session.config.enable_object_tracking:
+        detections = await object_tracker.update_trackers(
+            small_frame,
+            detections,
+            session.trackers
+        )
+
+    detections = scale_detections(detections, small_frame.shape, frame.shape)
+
+    # Apply blur to detected regions (clean frames pass through untouched)
+    if detections:
+        async with stream_pool.acquire():
+            blurred_frame = await blur_applicator.apply_blur(frame, detections, in_place=True)
+    else:
+        blurred_frame = frame
+
+    return detections, blurred_frame
+
+
+async def read_frame_body(request: Request) -> bytes:
+    """
+    Read frame bytes from the request
+
+    Raw bodies (application/octet-stream) are used as-is, skipping the
+    multipart parser and its temporary-file spooling. Multipart uploads in
+    a 'frame_data' or 'frame' field are still accepted for older clients.
+    """
+    content_type = request.headers.get('content-type', '')
+
+    if not content_type.startswith('multipart/form-data'):
+        return await request.body()
+
+    form = await request.form()
+    upload = form.get('frame_data') or form.get('frame')
+
+    if upload is None:
+        raise HTTPException(status_code=400, detail="Missing frame_data field")
+
+    return await upload.read()
+
+
 @app.post("/process/frame")
-async def process_frame(
-    session_id: str,
-    frame_data: UploadFile = File(...)
-):
-    """Process a single video frame"""
-    if session_id not in active_sessions:
+async def process_frame(session_id: str, request: Request):
+    """Process a single video frame (raw JPEG body or multipart upload)"""
+    session = await get_session(session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    session = active_sessions[session_id]
-    session.frame_count += 1
+    frame_id = await session.next_frame()
+    if frame_id is None:
+        raise HTTPException(status_code=404, detail="Session not found")
 
     # Check if we should process this frame
-    if not session.should_process_frame():
+    if not session.should_process_frame(frame_id):
         return {
-            "frame_id": session.frame_count,
+            "frame_id": frame_id,
             "skipped": True,
             "reason": "frame_sampling"
         }
 
+    # Read frame data
+    frame_bytes = await read_frame_body(request)
+
     try:
-        # Read frame data
-        frame_bytes = await frame_data.read()
-        nparr = np.frombuffer(frame_bytes, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        frame = jpeg_codec.decode(frame_bytes)
 
         if frame is None:
             raise HTTPException(status_code=400, detail="Invalid frame data")
 
         # Process frame with all enabled detectors
-        detections = []
-
-        if session.config.enable_text_detection:
-            text_results = await text_detector.detect(
-                frame,
-                session.config.text_confidence,
-                session.config.profanity_list
-            )
-            detections.extend(text_results)
-
-        if session.config.enable_nsfw_detection:
-            nsfw_results = await nsfw_detector.detect(
-                frame,
-                session.config.nsfw_confidence
-            )
-            detections.extend(nsfw_results)
-
-        # Update object trackers
-        if session.config.enable_object_tracking:
-            detections = await object_tracker.update_trackers(
-                frame,
-                detections,
-                session.trackers
-            )
-
-        # Apply blur to detected regions
-        blurred_frame = await blur_applicator.apply_blur(frame, detections)
+        detections, blurred_frame = await censor_frame(session, frame_id, frame)
 
         # Encode blurred frame to base64
-        _, buffer = cv2.imencode('.jpg', blurred_frame, [cv2.IMWRITE_JPEG_QUALITY, 90])
-        blurred_bytes = buffer.tobytes()
+        blurred_bytes = jpeg_codec.encode(blurred_frame, quality=90)
 
         # Convert to base64 for transmission
         import base64
         blurred_frame_b64 = base64.b64encode(blurred_bytes).decode('utf-8')
 
-        return {
-            "frame_id": session.frame_count,
-            "detections": [d for d in detections],
+        # Returned as a response directly to skip jsonable_encoder's walk
+        # over every detection dict
+        return ORJSONResponse({
+            "frame_id": frame_id,
+            "detections": detections,
             "detection_count": len(detections),
             "processing_time_ms": 0,  # Will be calculated by caller
             "has_blur": len(detections) > 0,
             "processed_frame": blurred_frame_b64 if len(detections) > 0 else None,  # Include blurred frame
             "frame_width": frame.shape[1],
             "frame_height": frame.shape[0]
-        }
+        })
 
     except Exception as e:
         logger.error(f"Error processing frame: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/process/stream")
+async def process_stream(session_id: str, request: Request):
+    """
+    Process a chunk of a raw H.264/H.265 Annex-B stream
+
+    The body is the next chunk of the session's elementary stream; decoder
+    state persists on the session, so NAL units may span requests.
+    """
+    session = await get_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    try:
+        if session.video_decoder is None:
+            session.video_decoder = VideoStreamDecoder()
+
+        chunk = await request.body()
+        loop = asyncio.get_event_loop()
+        frames = await loop.run_in_executor(None, session.video_decoder.decode, chunk)
+
+        results = []
+
+        for frame in frames:
+            frame_id = await session.next_frame()
+            if frame_id is None:
+                raise HTTPException(status_code=404, detail="Session not found")
+
+            if not session.should_process_frame(frame_id):
+                results.append({
+                    "frame_id": frame_id,
+                    "skipped": True,
+                    "reason": "frame_sampling"
+                })
+                continue
+
+            detections, _ = await censor_frame(session, frame_id, frame)
+
+            results.append({
+                "frame_id": frame_id,
+                "detections": detections,
+                "detection_count": len(detections),
+                "has_blur": len(detections) > 0,
+                "frame_width": frame.shape[1],
+                "frame_height": frame.shape[0]
+            })
+
+        return {
+            "decoded_frames": len(frames),
+            "decoder": session.video_decoder.backend,
+            "frames": results
+        }
+
+    except HTTPException:
+        raise
+
+    except Exception as e:
+        logger.error(f"Error processing stream chunk: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # ============================================================================
 # AUDIO PROCESSING ENDPOINT
 # ============================================================================
@@ -325,11 +647,10 @@ async def process_audio(
     audio_data: UploadFile = File(...)
 ):
     """Process audio chunk for profanity detection"""
-    if session_id not in active_sessions:
+    session = await get_session(session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    session = active_sessions[session_id]
-
     if not session.config.enable_audio_profanity:
         return {"profanity_detected": False, "timestamps": []}
 
@@ -355,18 +676,72 @@ async def process_audio(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/process/audio/stream")
+async def process_audio_stream(session_id: str, request: Request):
+    """
+    Process raw PCM audio while it is still uploading
+
+    The body is 16-bit little-endian mono PCM (AUDIO_STREAM_SAMPLE_RATE,
+    16 kHz by default), ideally sent with chunked transfer encoding. Each
+    window is transcribed as soon as it arrives, so by the end of the
+    upload only the last window is left to process.
+    """
+    session = await get_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    if not session.config.enable_audio_profanity or audio_profanity_detector is None:
+        return {"profanity_detected": False, "timestamps": []}
+
+    # Bounded so a fast uploader can't buffer unbounded audio ahead of Whisper
+    queue = asyncio.Queue(maxsize=AUDIO_STREAM_QUEUE_SIZE)
+
+    async def read_body():
+        try:
+            async for chunk in request.stream():
+                if chunk:
+                    await queue.put(chunk)
+        finally:
+            await queue.put(None)
+
+    reader = asyncio.create_task(read_body())
+
+    try:
+        windows = [
+            window async for window in audio_profanity_detector.detect_stream(
+                queue,
+                session.config.audio_confidence,
+                session.config.profanity_list
+            )
+        ]
+        await reader
+
+    except Exception as e:
+        logger.error(f"Error processing audio stream: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    finally:
+        reader.cancel()
+
+    detections = [d for window in windows for d in window['detections']]
+
+    return {
+        "profanity_detected": len(detections) > 0,
+        "detections": detections,
+        "count": len(detections),
+        "windows": windows
+    }
+
+
 # ============================================================================
 # CENSORSHIP ENDPOINTS (Aliases for backward compatibility)
 # ============================================================================
 
 @app.post("/censorship/process-frame")
-async def censorship_process_frame(
-    session_id: str,
-    frame: UploadFile = File(...)
-):
+async def censorship_process_frame(session_id: str, request: Request):
     """Alias endpoint for frame processing (censorship-specific naming)"""
     # Delegate to the main process_frame endpoint
-    return await process_frame(session_id=session_id, frame_data=frame)
+    return await process_frame(session_id=session_id, request=request)
 
 
 # ============================================================================
@@ -375,82 +750,241 @@ async def censorship_process_frame(
 
 @app.websocket("/ws/stream/{session_id}")
 async def websocket_stream(websocket: WebSocket, session_id: str):
-    """WebSocket endpoint for real-time frame streaming"""
+    """
+    WebSocket endpoint for real-time frame streaming
+
+    Frames flow through decode -> detect -> track/blur -> encode/send stages
+    connected by bounded queues, so several frames are in flight at once and
+    each stage's latency is hidden behind the next frame's work.
+    """
     await websocket.accept()
 
-    if session_id not in active_sessions:
+    session = await get_session(session_id)
+    if session is None:
         await websocket.send_json({"error": "Session not found"})
         await websocket.close()
         return
 
-    session = active_sessions[session_id]
     logger.info(f"WebSocket connected for session: {session_id}")
 
-    try:
+    loop = asyncio.get_event_loop()
+
+    # Session config is fixed for the connection; bind flags and hot
+    # methods once instead of dereferencing them on every frame
+    cfg = session.config
+    enable_text = cfg.enable_text_detection
+    enable_nsfw = cfg.enable_nsfw_detection
+    enable_tracking = cfg.enable_object_tracking
+    text_conf = cfg.text_confidence
+    nsfw_conf = cfg.nsfw_confidence
+    prof_list = tuple(cfg.profanity_list)
+    trackers = session.trackers
+
+    text_detect = text_detector.detect if enable_text else None
+    nsfw_submit = nsfw_batcher.submit if enable_nsfw else None
+    update_trackers = object_tracker.update_trackers if enable_tracking else None
+    apply_blur = blur_applicator.apply_blur
+    acquire_stream = stream_pool.acquire
+    decode = jpeg_codec.decode
+    encode = jpeg_codec.encode
+    next_frame = session.next_frame
+    should_process_frame = session.should_process_frame
+    is_keyframe = session.is_keyframe
+    pack_header = FRAME_HEADER.pack
+    send_text = websocket.send_text
+
+    def decode_for_detection(data):
+        frame = decode(data)
+        if frame is None:
+            return None, None
+        return frame, downscale_for_detection(frame)
+
+    # Queue items are (frame_id, status, frame, small_frame, detections)
+    decode_queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+    detect_queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+    track_queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+    send_queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+
+    async def receive_stage():
         while True:
-            # Receive frame data
             data = await websocket.receive_bytes()
-            session.frame_count += 1
+            frame_id = await next_frame()
 
-            # Check if we should process this frame
-            if not session.should_process_frame():
-                await websocket.send_json({
-                    "frame_id": session.frame_count,
-                    "skipped": True
-                })
-                continue
+            # Session deleted mid-stream: tell the client and end the stream
+            if frame_id is None:
+                await send_text(SESSION_NOT_FOUND_MESSAGE)
+                await websocket.close()
+                raise WebSocketDisconnect()
+
+            # Skipped frames pass through every stage so responses stay in order
+            if not should_process_frame(frame_id):
+                await decode_queue.put((frame_id, 'skipped', None, None, None))
+            else:
+                await decode_queue.put((frame_id, 'ok', data, None, None))
+
+    async def decode_stage():
+        while True:
+            frame_id, status, data, _, _ = await decode_queue.get()
+
+            frame = small_frame = None
+            if status == 'ok':
+                frame, small_frame = await loop.run_in_executor(None, decode_for_detection, data)
+                if frame is None:
+                    status = 'invalid'
+
+            await detect_queue.put((frame_id, status, frame, small_frame, None))
 
-            # Decode frame
-            nparr = np.frombuffer(data, np.uint8)
-            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    async def detect_stage():
+        while True:
+            frame_id, status, frame, small_frame, _ = await detect_queue.get()
+
+            if status != 'ok':
+                await track_queue.put((frame_id, status, frame, small_frame, None))
+                continue
 
-            if frame is None:
-                await websocket.send_json({"error": "Invalid frame"})
+            # Tracking-only frame: trackers predict boxes in the next stage
+            if not is_keyframe(frame_id):
+                await track_queue.put((frame_id, status, frame, small_frame, []))
                 continue
 
-            # Process frame (same logic as HTTP endpoint)
+            tasks = []
+            if enable_text:
+                tasks.append(text_detect(small_frame, text_conf, prof_list))
+            if enable_nsfw:
+                tasks.append(nsfw_submit(small_frame, nsfw_conf))
+
             detections = []
+            for results in await asyncio.gather(*tasks):
+                detections.extend(results)
 
-            if session.config.enable_text_detection:
-                text_results = await text_detector.detect(
-                    frame,
-                    session.config.text_confidence,
-                    session.config.profanity_list
-                )
-                detections.extend(text_results)
+            await track_queue.put((frame_id, status, frame, small_frame, detections))
 
-            if session.config.enable_nsfw_detection:
-                nsfw_results = await nsfw_detector.detect(
-                    frame,
-                    session.config.nsfw_confidence
-                )
-                detections.extend(nsfw_results)
+    async def track_blur_stage():
+        while True:
+            frame_id, status, frame, small_frame, detections = await track_queue.get()
 
-            if session.config.enable_object_tracking:
-                detections = await object_tracker.update_trackers(
-                    frame,
-                    detections,
-                    session.trackers
-                )
+            if status != 'ok':
+                await send_queue.put((frame_id, status, frame, None, detections))
+                continue
 
-            # Apply blur
-            blurred_frame = await blur_applicator.apply_blur(frame, detections)
+            if enable_tracking:
+                detections = await update_trackers(small_frame, detections, trackers)
 
-            # Encode and send
-            _, buffer = cv2.imencode('.jpg', blurred_frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+            detections = scale_detections(detections, small_frame.shape, frame.shape)
+            if detections:
+                async with acquire_stream():
+                    blurred_frame = await apply_blur(frame, detections, in_place=True)
+            else:
+                blurred_frame = frame
 
-            await websocket.send_json({
-                "frame_id": session.frame_count,
-                "detection_count": len(detections),
-                "has_blur": len(detections) > 0
-            })
-            await websocket.send_bytes(buffer.tobytes())
+            await send_queue.put((frame_id, status, blurred_frame, None, detections))
+
+    async def encode_send_stage():
+        while True:
+            frame_id, status, blurred_frame, _, detections = await send_queue.get()
+
+            if status == 'skipped':
+                await send_text(SKIPPED_FRAME_TEMPLATE % frame_id)
+                continue
+
+            if status == 'invalid':
+                await send_text(INVALID_FRAME_MESSAGE)
+                continue
+
+            # Encode and send header + JPEG as a single binary message
+            jpeg = await loop.run_in_executor(None, encode, blurred_frame, 85)
+
+            header = pack_header(
+                frame_id,
+                len(detections),
+                len(detections) > 0,
+                len(jpeg)
+            )
+            await websocket.send_bytes(header + jpeg)
+
+    stages = [
+        asyncio.create_task(stage())
+        for stage in (receive_stage, decode_stage, detect_stage, track_blur_stage, encode_send_stage)
+    ]
+
+    try:
+        # Stages only return by raising (disconnect or error)
+        done, _ = await asyncio.wait(stages, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            task.result()
 
     except WebSocketDisconnect:
         logger.info(f"WebSocket disconnected for session: {session_id}")
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
         await websocket.close()
+    finally:
+        # Cancel remaining stages so in-flight frames are dropped cleanly
+        for task in stages:
+            task.cancel()
+        await asyncio.gather(*stages, return_exceptions=True)
+
+
+@app.websocket("/ws/stream_h264/{session_id}")
+async def websocket_stream_h264(websocket: WebSocket, session_id: str):
+    """
+    WebSocket endpoint for raw H.264/H.265 Annex-B streams
+
+    Each binary message is the next chunk of the elementary stream; every
+    decoded frame is answered in the same format as /ws/stream.
+    """
+    await websocket.accept()
+
+    session = await get_session(session_id)
+    if session is None:
+        await websocket.send_json({"error": "Session not found"})
+        await websocket.close()
+        return
+
+    logger.info(f"H.264 WebSocket connected for session: {session_id}")
+
+    loop = asyncio.get_event_loop()
+
+    try:
+        # A new connection starts a new elementary stream
+        session.video_decoder = VideoStreamDecoder()
+
+        while True:
+            chunk = await websocket.receive_bytes()
+            frames = await loop.run_in_executor(None, session.video_decoder.decode, chunk)
+
+            for frame in frames:
+                frame_id = await session.next_frame()
+
+                # Session deleted mid-stream: tell the client and end the stream
+                if frame_id is None:
+                    await websocket.send_text(SESSION_NOT_FOUND_MESSAGE)
+                    await websocket.close()
+                    raise WebSocketDisconnect()
+
+                if not session.should_process_frame(frame_id):
+                    await websocket.send_text(SKIPPED_FRAME_TEMPLATE % frame_id)
+                    continue
+
+                detections, blurred_frame = await censor_frame(session, frame_id, frame)
+
+                jpeg = await loop.run_in_executor(None, jpeg_codec.encode, blurred_frame, 85)
+
+                header = FRAME_HEADER.pack(
+                    frame_id,
+                    len(detections),
+                    len(detections) > 0,
+                    len(jpeg)
+                )
+                await websocket.send_bytes(header + jpeg)
+
+    except WebSocketDisconnect:
+        logger.info(f"H.264 WebSocket disconnected for session: {session_id}")
+    except Exception as e:
+        logger.error(f"H.264 WebSocket error: {e}")
+        await websocket.close()
+    finally:
+        session.video_decoder = None
 
 
 if __name__ == "__main__":
@@ -0,0 +1,168 @@
+"""
+NudeNet INT8 Quantizer
+
+Statically quantizes NudeNet's ONNX detector to INT8 (QDQ format) with
+ONNX Runtime, calibrated on sample frames:
+- ~4x smaller weights, half the activation bandwidth
+- INT8 tensor cores under the TensorRT EP, VNNI under OpenVINO/CPU
+
+Serve the result with NSFW_MODEL_PATH (plus NSFW_EXECUTION_PROVIDER=tensorrt
+and NSFW_TRT_INT8=true on GPU). Needs the `onnx` package at build time only.
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+import numpy as np
+
+from onnxruntime.quantization import (
+    CalibrationDataReader,
+    CalibrationMethod,
+    QuantFormat,
+    QuantType,
+    quantize_static
+)
+from onnxruntime.quantization.shape_inference import quant_pre_process
+
+
+def preprocess_image(img, input_size=320):
+    """Pad a BGR image to square, resize, and convert to NCHW float32 RGB in [0, 1] (NudeNet layout)"""
+    import cv2
+
+    height, width = img.shape[:2]
+    max_size = max(height, width)
+    img = cv2.copyMakeBorder(img, 0, max_size - height, 0, max_size - width, cv2.BORDER_CONSTANT)
+    img = cv2.resize(img, (input_size, input_size))
+    img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    return img.transpose(2, 0, 1)[np.newaxis].astype(np.float32) / 255.0
+
+
+class ImageCalibrationReader(CalibrationDataReader):
+    """Feeds calibration images to ONNX Runtime one at a time"""
+
+    IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+    def __init__(self, calib_dir, input_name, input_size=320, max_images=500):
+        self.input_name = input_name
+        self.input_size = input_size
+        self.image_paths = sorted(
+            str(path) for path in Path(calib_dir).iterdir()
+            if path.suffix.lower() in self.IMAGE_EXTENSIONS
+        )[:max_images]
+        self.index = 0
+
+        if not self.image_paths:
+            print(f"[Quantize] ✗ No calibration images found in {calib_dir}")
+            sys.exit(1)
+
+        print(f"[Quantize] Calibrating with {len(self.image_paths)} images from {calib_dir}")
+
+    def get_next(self):
+        """Next calibration input; None once all images are used"""
+        import cv2
+
+        while self.index < len(self.image_paths):
+            path = self.image_paths[self.index]
+            self.index += 1
+
+            img = cv2.imread(path)
+            if img is None:
+                print(f"[Quantize] ⚠ Skipping unreadable calibration image: {path}")
+                continue
+
+            return {self.input_name: preprocess_image(img, self.input_size)}
+
+        return None
+
+
+def default_model_path():
+    """Path of the FP32 model bundled with the nudenet package"""
+    import nudenet
+
+    return os.path.join(os.path.dirname(nudenet.__file__), '320n.onnx')
+
+
+def quantize(onnx_path, output_path, calib_dir, input_size=320, max_images=500,
+             per_channel=True):
+    """Quantize an ONNX detector to INT8 QDQ"""
+    import onnxruntime as ort
+
+    print(f"[Quantize] Quantizing NudeNet:")
+    print(f"  - Input: {onnx_path}")
+    print(f"  - Output: {output_path}")
+    print(f"  - Per-channel: {per_channel}")
+
+    # Shape inference + graph optimization first, as ORT recommends (ONNX
+    # shape inference suffices; the symbolic pass cannot resolve YOLO's head)
+    prepared_path = str(Path(output_path).with_suffix('.prep.onnx'))
+    quant_pre_process(onnx_path, prepared_path, skip_symbolic_shape=True)
+
+    session = ort.InferenceSession(prepared_path, providers=['CPUExecutionProvider'])
+    input_name = session.get_inputs()[0].name
+    del session
+
+    reader = ImageCalibrationReader(calib_dir, input_name, input_size, max_images)
+
+    try:
+        quantize_static(
+            prepared_path,
+            output_path,
+            reader,
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=per_channel,
+            calibrate_method=CalibrationMethod.Entropy
+        )
+    finally:
+        os.remove(prepared_path)
+
+    size_in = os.path.getsize(onnx_path) / (1024 * 1024)
+    size_out = os.path.getsize(output_path) / (1024 * 1024)
+    print(f"[Quantize] ✓ INT8 model saved: {output_path} ({size_in:.1f}MB → {size_out:.1f}MB)")
+
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Quantize NudeNet ONNX to INT8')
+    parser.add_argument('--onnx', type=str, help='Path to FP32 ONNX model (default: bundled NudeNet model)')
+    parser.add_argument('--output', type=str, default='nudenet_int8.onnx', help='Output INT8 ONNX path')
+    parser.add_argument('--calib-dir', type=str, required=True, help='Directory of calibration images')
+    parser.add_argument('--input-size', type=int, default=320, help='Model input resolution')
+    parser.add_argument('--max-images', type=int, default=500, help='Maximum calibration images')
+    parser.add_argument('--per-tensor', action='store_true', help='Per-tensor instead of per-channel weights')
+
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  INT8 Quantizer - NudeNet Optimization")
+    print("=" * 60)
+
+    onnx_path = args.onnx or default_model_path()
+    if not os.path.exists(onnx_path):
+        print(f"[Quantize] ✗ ONNX file not found: {onnx_path}")
+        sys.exit(1)
+
+    quantize(
+        onnx_path,
+        args.output,
+        args.calib_dir,
+        input_size=args.input_size,
+        max_images=args.max_images,
+        per_channel=not args.per_tensor
+    )
+
+    print("=" * 60)
+    print("  Quantization Complete!")
+    print("=" * 60)
+    print(f"\nNext steps:")
+    print(f"1. Copy {args.output} into the image, e.g. /app/models/nudenet_int8.onnx")
+    print(f"2. Set NSFW_MODEL_PATH=/app/models/nudenet_int8.onnx")
+    print(f"3. On GPU, set NSFW_EXECUTION_PROVIDER=tensorrt and NSFW_TRT_INT8=true")
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -7,11 +7,17 @@ from .nsfw_detector import NSFWDetector
 from .object_tracker import ObjectTracker
 from .audio_profanity import AudioProfanityDetector
 from .blur_applicator import BlurApplicator
+from .gpu_codec import JpegCodec
+from .batch_queue import BatchedInferenceQueue
+from .cuda_streams import StreamPool
 
 __all__ = [
     'TextDetector',
     'NSFWDetector',
     'ObjectTracker',
     'AudioProfanityDetector',
-    'BlurApplicator'
+    'BlurApplicator',
+    'JpegCodec',
+    'BatchedInferenceQueue',
+    'StreamPool'
 ]
@@ -7,18 +7,97 @@ import os
 import logging
 import asyncio
 import io
-from typing import List, Dict, Optional
+import re
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import AsyncIterator, List, Dict, Optional
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+    logger.warning("pyahocorasick not installed, custom profanity lists use a linear scan")
+
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None
+    logger.warning("webrtcvad not installed, silent audio is transcribed too")
+
+# Whisper consumes 30 s windows of 16 kHz audio (3000 mel frames)
+WHISPER_SAMPLE_RATE = 16000
+WHISPER_WINDOW_SECONDS = 30
+WHISPER_WINDOW_FRAMES = 3000
+
+# Seconds per Whisper timestamp token
+WHISPER_TIME_PRECISION = 0.02
+
+# WebRTC VAD works on 10/20/30 ms frames at these rates only
+VAD_SAMPLE_RATES = (8000, 16000, 32000, 48000)
+VAD_FRAME_MS = 30
+
+
+@lru_cache(maxsize=32)
+def _build_profanity_automaton(words: tuple):
+    """
+    Build (once per distinct list) an Aho-Corasick automaton over lowercased
+    words; None if the list has no non-empty words
+    """
+    automaton = ahocorasick.Automaton()
+
+    # Value is the word's position in the list, so the earliest listed
+    # spelling of a word wins
+    for index, word in enumerate(words):
+        lowered = word.lower()
+        if lowered and lowered not in automaton:
+            automaton.add_word(lowered, (index, word))
+
+    # An automaton without words cannot be built or searched
+    if not len(automaton):
+        return None
+
+    automaton.make_automaton()
+    return automaton
+
+
+# Dedicated Whisper thread(s): the model stays warm on the same thread and
+# long transcriptions don't starve the default pool used for JPEG work
+_whisper_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('WHISPER_EXECUTOR_WORKERS', 1)),
+    thread_name_prefix='whisper'
+)
+
 
 class AudioProfanityDetector:
     """Detects profanity in audio streams using transcription"""
 
     def __init__(self):
         self.whisper_model = None
+        self.whisper_backend = None
+        self.whisper_tokenizer = None
+        self.whisper_processor = None
         self.profanity_filter = None
+        self.profanity_pattern = None
+        self.generate_poll_interval = float(os.getenv('WHISPER_POLL_INTERVAL_MS', 2)) / 1000
+
+        # Raw PCM stream format (resampled to Whisper's 16 kHz when different)
+        self.stream_sample_rate = int(os.getenv('AUDIO_STREAM_SAMPLE_RATE', 16000))
+        # New audio per window plus re-transcribed overlap; together they fill
+        # one 30 s Whisper window, whose cost barely depends on clip length
+        self.stream_window_seconds = float(os.getenv('AUDIO_STREAM_WINDOW_SECONDS', 25.0))
+        self.stream_overlap_seconds = float(os.getenv('AUDIO_STREAM_OVERLAP_SECONDS', 5.0))
+
+        # Voice activity gate: audio with less speech than this is not transcribed
+        self.vad = None
+        self.vad_min_speech_ratio = float(os.getenv('AUDIO_VAD_MIN_SPEECH_RATIO', 0.1))
+        vad_mode = int(os.getenv('AUDIO_VAD_MODE', 2))
+        if webrtcvad is not None and vad_mode >= 0:
+            self.vad = webrtcvad.Vad(vad_mode)
+
         self._load_models()
         logger.info("AudioProfanityDetector initialized")
 
@@ -29,6 +108,7 @@ class AudioProfanityDetector:
             from better_profanity import profanity
             profanity.load_censor_words()
             self.profanity_filter = profanity
+            self._compile_profanity_pattern()
 
             logger.info("Profanity filter loaded")
 
@@ -37,15 +117,13 @@ class AudioProfanityDetector:
 
             if whisper_enabled:
                 try:
-                    import whisper
-                    model_size = os.getenv('WHISPER_MODEL_SIZE', 'base')
-                    logger.info(f"Loading Whisper model ({model_size})...")
-                    self.whisper_model = whisper.load_model(model_size)
-                    logger.info("Whisper model loaded")
+                    self._load_whisper(os.getenv('WHISPER_MODEL_SIZE', 'base'))
+                    self._warmup_whisper(int(os.getenv('WHISPER_WARMUP_RUNS', 1)))
                 except Exception as e:
                     logger.warning(f"Could not load Whisper locally: {e}")
                     logger.info("Will use cloud API for transcription if API key is provided")
                     self.whisper_model = None
+                    self.whisper_backend = None
             else:
                 logger.info("Local Whisper disabled, will use cloud API if available")
 
@@ -53,34 +131,369 @@ class AudioProfanityDetector:
             logger.error(f"Error loading audio models: {e}")
             logger.warning("Audio profanity detection will be limited")
 
+    def _compile_profanity_pattern(self):
+        """
+        Compile better-profanity's word list (with its character substitutions,
+        e.g. a -> @/4) into one case-insensitive regex
+
+        better-profanity compares every token against every word in Python and
+        contains_profanity() censors the whole text to find out; one regex
+        scan finds the hits and produces the censored text at once.
+        """
+        # Tokenize like better-profanity: letters, digits and @$*"' form words
+        word_char = r'(?:[^\W_]|[@$*"\'])'
+        separator = r'(?:[^\w@$*"\']|_)*'
+
+        alternatives = []
+        for word in self.profanity_filter.CENSOR_WORDSET:
+            parts = []
+            for chars in word._char_combos:
+                if chars == (' ',):
+                    parts.append(separator)
+                    continue
+
+                options = sorted((re.escape(c) for c in chars if c), key=len, reverse=True)
+                group = options[0] if len(options) == 1 else f"(?:{'|'.join(options)})"
+                parts.append(group + '?' if '' in chars else group)
+
+            alternatives.append((len(str(word)), ''.join(parts)))
+
+        if not alternatives:
+            self.profanity_pattern = None
+            return
+
+        # Longest words first so a phrase wins over the word it starts with
+        alternatives.sort(key=lambda item: item[0], reverse=True)
+
+        self.profanity_pattern = re.compile(
+            f"(?<!{word_char})(?:{'|'.join(pattern for _, pattern in alternatives)})(?!{word_char})",
+            re.IGNORECASE
+        )
+
+    def _load_whisper(self, model_size: str):
+        """Load faster-whisper (CTranslate2), falling back to openai-whisper"""
+        if os.getenv('WHISPER_BACKEND', 'auto').lower() == 'onnx_int8':
+            self._load_whisper_onnx(os.getenv('WHISPER_ONNX_DIR', '/app/models/whisper-onnx-int8'))
+            return
+
+        try:
+            import ctranslate2
+            from faster_whisper import WhisperModel
+
+            device = 'cuda' if ctranslate2.get_cuda_device_count() > 0 else 'cpu'
+
+            # INT8 weights with FP16 activations on GPU, plain INT8 on CPU
+            default_compute_type = 'int8_float16' if device == 'cuda' else 'int8'
+            compute_type = os.getenv('WHISPER_COMPUTE_TYPE', default_compute_type)
+
+            # CTranslate2 worker threads shared by all concurrent requests;
+            # asynchronous generate() calls queue onto them
+            num_workers = int(os.getenv('WHISPER_NUM_WORKERS', 2))
+
+            logger.info(f"Loading faster-whisper model ({model_size}, {device}, {compute_type})...")
+            self.whisper_model = WhisperModel(
+                model_size,
+                device=device,
+                compute_type=compute_type,
+                num_workers=num_workers
+            )
+            self.whisper_backend = 'faster_whisper'
+
+            from faster_whisper.tokenizer import Tokenizer
+            self.whisper_tokenizer = Tokenizer(
+                self.whisper_model.hf_tokenizer,
+                self.whisper_model.model.is_multilingual,
+                task='transcribe',
+                language=os.getenv('WHISPER_LANGUAGE', 'en')
+            )
+            logger.info("faster-whisper model loaded")
+            return
+
+        except ImportError as e:
+            logger.warning(f"faster-whisper not available ({e}), trying openai-whisper")
+
+        import whisper
+        logger.info(f"Loading Whisper model ({model_size})...")
+        self.whisper_model = whisper.load_model(model_size)
+        self.whisper_backend = 'openai_whisper'
+        logger.info("Whisper model loaded")
+
+    def _warmup_whisper(self, runs: int):
+        """Run a few transcriptions of silence so the first request skips lazy init"""
+        if runs <= 0:
+            return
+
+        silence = np.zeros(WHISPER_SAMPLE_RATE, dtype=np.float32)
+
+        if self.whisper_backend == 'faster_whisper':
+            transcribe = self._transcribe_faster_whisper
+        elif self.whisper_backend == 'onnx_int8':
+            transcribe = self._transcribe_onnx
+        else:
+            transcribe = self.whisper_model.transcribe
+
+        for _ in range(runs):
+            _whisper_executor.submit(transcribe, silence).result()
+
+        logger.info(f"Whisper warmed up ({runs} run(s))")
+
+    def _load_whisper_onnx(self, model_dir: str):
+        """
+        Load a pre-quantized INT8 ONNX Whisper export with ONNX Runtime
+
+        The directory comes from `optimum-cli export onnx --task
+        automatic-speech-recognition-with-past` followed by dynamic INT8
+        quantization, and holds encoder_model.onnx, decoder_model.onnx,
+        decoder_with_past_model.onnx plus the processor files.
+        """
+        import onnxruntime as ort
+        from optimum.onnxruntime import ORTModelForSpeechSeq2Seq
+        from transformers import WhisperProcessor
+
+        provider = (
+            'CUDAExecutionProvider'
+            if 'CUDAExecutionProvider' in ort.get_available_providers()
+            else 'CPUExecutionProvider'
+        )
+
+        logger.info(f"Loading INT8 ONNX Whisper from {model_dir} ({provider})...")
+        self.whisper_processor = WhisperProcessor.from_pretrained(model_dir)
+        self.whisper_model = ORTModelForSpeechSeq2Seq.from_pretrained(model_dir, provider=provider)
+        self.whisper_backend = 'onnx_int8'
+        logger.info("INT8 ONNX Whisper loaded")
+
+    def _transcribe_onnx(self, audio_data: np.ndarray) -> Dict:
+        """Transcribe with the ONNX Runtime model, one 30 s window at a time"""
+        window_samples = WHISPER_SAMPLE_RATE * WHISPER_WINDOW_SECONDS
+        segments = []
+
+        for start in range(0, max(len(audio_data), 1), window_samples):
+            window = audio_data[start:start + window_samples].astype(np.float32, copy=False)
+
+            input_features = self.whisper_processor(
+                window,
+                sampling_rate=WHISPER_SAMPLE_RATE,
+                return_tensors='pt'
+            ).input_features
+
+            token_ids = self.whisper_model.generate(input_features)
+            text = self.whisper_processor.batch_decode(token_ids, skip_special_tokens=True)[0].strip()
+
+            if text:
+                segments.append({
+                    "start": start / WHISPER_SAMPLE_RATE,
+                    "end": (start + len(window)) / WHISPER_SAMPLE_RATE,
+                    "text": text
+                })
+
+        return {
+            "text": " ".join(segment["text"] for segment in segments),
+            "segments": segments
+        }
+
+    def _transcribe_faster_whisper(self, audio_data: np.ndarray) -> Dict:
+        """Run faster-whisper and return a Whisper-style result dict"""
+        segments, _ = self.whisper_model.transcribe(
+            audio_data.astype(np.float32, copy=False),
+            beam_size=1,
+            vad_filter=True
+        )
+
+        # Segments are a lazy generator; decoding happens while iterating
+        segment_list = [
+            {"start": segment.start, "end": segment.end, "text": segment.text}
+            for segment in segments
+        ]
+
+        return {
+            "text": " ".join(segment["text"].strip() for segment in segment_list),
+            "segments": segment_list
+        }
+
+    def _encode_window(self, audio_data: np.ndarray):
+        """Compute mel features for one 30 s window and run the encoder"""
+        # Pad with silence to a full window, like whisper's pad_or_trim
+        window_samples = WHISPER_SAMPLE_RATE * WHISPER_WINDOW_SECONDS
+        audio_data = np.pad(
+            audio_data.astype(np.float32, copy=False),
+            (0, max(0, window_samples - len(audio_data)))
+        )
+
+        features = self.whisper_model.feature_extractor(audio_data)
+        return self.whisper_model.encode(features[:, :WHISPER_WINDOW_FRAMES])
+
+    async def _transcribe_faster_whisper_async(self, audio_data: np.ndarray) -> Dict:
+        """
+        Transcribe a clip of up to 30 s with CTranslate2's asynchronous generate
+
+        Only feature extraction and the encoder pass hold an executor thread;
+        decoding runs on CTranslate2's own workers while this coroutine polls
+        the result, so concurrent requests don't each pin a pool thread.
+        """
+        loop = asyncio.get_event_loop()
+        encoder_output = await loop.run_in_executor(_whisper_executor, self._encode_window, audio_data)
+
+        tokenizer = self.whisper_tokenizer
+
+        # Timestamp tokens give per-segment times, which stream windows use to
+        # report overlapping audio only once
+        prompt = list(tokenizer.sot_sequence)
+
+        async_result = self.whisper_model.model.generate(
+            encoder_output,
+            [prompt],
+            beam_size=1,
+            asynchronous=True
+        )[0]
+
+        while not async_result.done():
+            await asyncio.sleep(self.generate_poll_interval)
+
+        duration = len(audio_data) / WHISPER_SAMPLE_RATE
+        segments = self._split_timestamped_tokens(async_result.result().sequences_ids[0], duration)
+
+        return {
+            "text": " ".join(segment["text"] for segment in segments),
+            "segments": segments
+        }
+
+    def _split_timestamped_tokens(self, token_ids: List[int], duration: float) -> List[Dict]:
+        """
+        Split Whisper output tokens into segments at its timestamp tokens
+
+        Args:
+            token_ids: Generated token ids (text and timestamp tokens)
+            duration: Clip length in seconds, ends an unterminated last segment
+
+        Returns:
+            List of segments with start/end (seconds) and text
+        """
+        tokenizer = self.whisper_tokenizer
+        timestamp_begin = tokenizer.timestamp_begin
+        segments = []
+        text_tokens = []
+        segment_start = None
+
+        def close_segment(end: float):
+            text = tokenizer.decode(text_tokens).strip()
+            if text:
+                segments.append({"start": segment_start or 0.0, "end": end, "text": text})
+
+        for token in token_ids:
+            if token < timestamp_begin:
+                if token < tokenizer.eot:
+                    text_tokens.append(token)
+                continue
+
+            time = (token - timestamp_begin) * WHISPER_TIME_PRECISION
+
+            if text_tokens:
+                close_segment(min(time, duration))
+                text_tokens = []
+                segment_start = None
+            else:
+                segment_start = time
+
+        if text_tokens:
+            close_segment(duration)
+
+        return segments
+
     def _extract_audio_from_bytes(self, audio_bytes: bytes) -> Optional[np.ndarray]:
-        """Extract audio array from bytes"""
+        """
+        Decode audio bytes into 16 kHz mono float32 (Whisper's input format)
+
+        FFmpeg (via PyAV) decodes, downmixes and resamples in one pass, so no
+        float64 stereo buffer is materialized and Whisper does not resample.
+        """
         try:
-            import soundfile as sf
+            import av
+
+            chunks = []
+            resampler = av.AudioResampler(format='flt', layout='mono', rate=WHISPER_SAMPLE_RATE)
 
-            # Read audio from bytes
-            audio_data, sample_rate = sf.read(io.BytesIO(audio_bytes))
+            with av.open(io.BytesIO(audio_bytes)) as container:
+                for frame in container.decode(audio=0):
+                    for resampled in resampler.resample(frame):
+                        chunks.append(resampled.to_ndarray().reshape(-1))
 
-            # Convert to mono if stereo
-            if len(audio_data.shape) > 1:
-                audio_data = np.mean(audio_data, axis=1)
+            # Drain samples buffered inside the resampler
+            for resampled in resampler.resample(None):
+                chunks.append(resampled.to_ndarray().reshape(-1))
 
-            return audio_data
+            if not chunks:
+                return np.zeros(0, dtype=np.float32)
+
+            return np.concatenate(chunks)
 
         except Exception as e:
             logger.error(f"Error extracting audio: {e}")
             return None
 
+    def _has_speech(self, audio_data: np.ndarray, sample_rate: int = WHISPER_SAMPLE_RATE) -> bool:
+        """
+        Check whether enough of the audio is voiced to be worth transcribing
+
+        Args:
+            audio_data: Mono float32 samples in [-1, 1]
+            sample_rate: Sample rate of audio_data
+
+        Returns:
+            False only when the VAD is available and finds (almost) no speech
+        """
+        if self.vad is None or sample_rate not in VAD_SAMPLE_RATES:
+            return True
+
+        frame_samples = sample_rate * VAD_FRAME_MS // 1000
+        frame_count = len(audio_data) // frame_samples
+        if frame_count == 0:
+            return False
+
+        pcm = (np.clip(audio_data[:frame_count * frame_samples], -1.0, 1.0) * 32767).astype('<i2').tobytes()
+        frame_bytes = frame_samples * 2
+
+        voiced = sum(
+            self.vad.is_speech(pcm[i:i + frame_bytes], sample_rate)
+            for i in range(0, len(pcm), frame_bytes)
+        )
+
+        return voiced / frame_count >= self.vad_min_speech_ratio
+
+    def _pcm_to_wav(self, pcm: bytes, sample_rate: int) -> bytes:
+        """Wrap 16-bit mono PCM in a WAV container (for the cloud API)"""
+        buffer = io.BytesIO()
+
+        with wave.open(buffer, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(sample_rate)
+            wav.writeframes(pcm)
+
+        return buffer.getvalue()
+
     async def _transcribe_local(self, audio_data: np.ndarray) -> Optional[Dict]:
         """Transcribe audio using local Whisper model"""
         if self.whisper_model is None:
             return None
 
         try:
+            if self.whisper_backend == 'faster_whisper':
+                # Short clips (stream windows, live chunks) fit one Whisper
+                # window and can decode asynchronously; longer audio needs
+                # transcribe()'s windowing and VAD
+                if len(audio_data) <= WHISPER_SAMPLE_RATE * WHISPER_WINDOW_SECONDS:
+                    return await self._transcribe_faster_whisper_async(audio_data)
+
+                transcribe = self._transcribe_faster_whisper
+            elif self.whisper_backend == 'onnx_int8':
+                transcribe = self._transcribe_onnx
+            else:
+                transcribe = self.whisper_model.transcribe
+
             loop = asyncio.get_event_loop()
             result = await loop.run_in_executor(
-                None,
-                self.whisper_model.transcribe,
+                _whisper_executor,
+                transcribe,
                 audio_data
             )
 
@@ -134,52 +547,98 @@ class AudioProfanityDetector:
         if not text:
             return detections
 
-        # Check with better-profanity
-        if self.profanity_filter:
-            contains_profanity = self.profanity_filter.contains_profanity(text)
+        # Check against better-profanity's word list in a single regex pass
+        if self.profanity_pattern is not None:
+            hits = []
+
+            def censor_hit(match):
+                hits.append(match.group(0))
+                return '****'
 
-            if contains_profanity:
-                # Censor to find what words were profane
-                censored = self.profanity_filter.censor(text)
+            censored = self.profanity_pattern.sub(censor_hit, text)
 
+            if hits:
                 detections.append({
                     "type": "audio_profanity",
                     "original_text": text,
                     "censored_text": censored,
+                    "matched_words": hits,
                     "method": "better_profanity",
                     "confidence": 0.9
                 })
 
         # Check custom profanity list
         if custom_profanity_list:
-            text_lower = text.lower()
-
-            for profane_word in custom_profanity_list:
-                if profane_word.lower() in text_lower:
-                    detections.append({
-                        "type": "audio_profanity",
-                        "matched_word": profane_word,
-                        "original_text": text,
-                        "method": "custom_list",
-                        "confidence": 1.0
-                    })
+            for profane_word in self._match_custom_words(text.lower(), custom_profanity_list):
+                detections.append({
+                    "type": "audio_profanity",
+                    "matched_word": profane_word,
+                    "original_text": text,
+                    "method": "custom_list",
+                    "confidence": 1.0
+                })
 
         return detections
 
-    def _extract_timestamps(self, transcription: Dict) -> List[Dict]:
-        """Extract timestamps from Whisper transcription"""
+    def _match_custom_words(self, text_lower: str, custom_profanity_list: List[str]) -> List[str]:
+        """
+        Find which custom words occur in the text, in a single pass over it
+
+        Words are reported in list order, once each; of several spellings of
+        the same word (e.g. "Damn" and "damn") the earliest listed one wins.
+        """
+        if ahocorasick is None:
+            matched = []
+            seen = set()
+
+            for word in custom_profanity_list:
+                lowered = word.lower()
+                if lowered and lowered not in seen:
+                    seen.add(lowered)
+                    if lowered in text_lower:
+                        matched.append(word)
+
+            return matched
+
+        automaton = _build_profanity_automaton(tuple(custom_profanity_list))
+        if automaton is None:
+            return []
+
+        return [word for _, word in sorted(set(value for _, value in automaton.iter(text_lower)))]
+
+    def _extract_timestamps(self, transcription: Dict, time_offset: float = 0.0) -> List[Dict]:
+        """Extract timestamps from Whisper transcription (shifted by time_offset seconds)"""
         timestamps = []
 
         if 'segments' in transcription:
             for segment in transcription['segments']:
                 timestamps.append({
-                    "start": segment.get('start', 0),
-                    "end": segment.get('end', 0),
+                    "start": segment.get('start', 0) + time_offset,
+                    "end": segment.get('end', 0) + time_offset,
                     "text": segment.get('text', '')
                 })
 
         return timestamps
 
+    def _segments_in_range(
+        self,
+        transcription: Dict,
+        report_range: tuple,
+        time_offset: float
+    ) -> Dict:
+        """Keep only the segments whose midpoint (in stream time) falls in report_range"""
+        report_from, report_to = report_range
+
+        segments = [
+            segment for segment in transcription['segments']
+            if report_from <= (segment['start'] + segment['end']) / 2 + time_offset < report_to
+        ]
+
+        return {
+            "text": " ".join(segment['text'].strip() for segment in segments),
+            "segments": segments
+        }
+
     async def detect(
         self,
         audio_bytes: bytes,
@@ -198,22 +657,73 @@ class AudioProfanityDetector:
             List of profanity detections with timestamps
         """
         try:
-            # Extract audio data
-            audio_data = self._extract_audio_from_bytes(audio_bytes)
+            # Decode off the event loop; long chunks take a while to parse
+            loop = asyncio.get_event_loop()
+            audio_data = await loop.run_in_executor(
+                None,
+                self._extract_audio_from_bytes,
+                audio_bytes
+            )
 
             if audio_data is None:
                 return []
 
+            return await self._detect_audio(
+                audio_data,
+                audio_bytes,
+                confidence_threshold,
+                profanity_list
+            )
+
+        except Exception as e:
+            logger.error(f"Error in audio profanity detection: {e}")
+            return []
+
+    async def _detect_audio(
+        self,
+        audio_data: np.ndarray,
+        audio_file_bytes: bytes,
+        confidence_threshold: float,
+        profanity_list: List[str] = None,
+        time_offset: float = 0.0,
+        sample_rate: int = WHISPER_SAMPLE_RATE,
+        report_range: Optional[tuple] = None
+    ) -> List[Dict]:
+        """
+        Transcribe decoded audio and detect profanity in the text
+
+        Args:
+            audio_data: Mono samples for local Whisper
+            audio_file_bytes: Encoded audio file for the cloud API
+            confidence_threshold: Minimum confidence for detection
+            profanity_list: Custom list of profane words
+            time_offset: Start of this audio within the stream (seconds)
+            sample_rate: Sample rate of audio_data
+            report_range: (start, end) stream seconds; only segments centered
+                in this range are checked (None checks everything)
+
+        Returns:
+            List of profanity detections with timestamps
+        """
+        try:
+            # Silence and noise cannot contain profanity; skip transcription
+            if not self._has_speech(audio_data, sample_rate):
+                logger.debug("No speech detected, skipping transcription")
+                return []
+
             # Transcribe audio (try local first, then cloud)
             transcription = await self._transcribe_local(audio_data)
 
             if transcription is None:
-                transcription = await self._transcribe_cloud(audio_bytes)
+                transcription = await self._transcribe_cloud(audio_file_bytes)
 
             if transcription is None:
                 logger.warning("Could not transcribe audio")
                 return []
 
+            if report_range is not None and transcription.get('segments'):
+                transcription = self._segments_in_range(transcription, report_range, time_offset)
+
             # Get transcribed text
             text = transcription.get('text', '')
 
@@ -226,7 +736,7 @@ class AudioProfanityDetector:
             detections = self._detect_profanity_in_text(text, profanity_list)
 
             # Add timestamps if available
-            timestamps = self._extract_timestamps(transcription)
+            timestamps = self._extract_timestamps(transcription, time_offset)
 
             for detection in detections:
                 detection['timestamps'] = timestamps
@@ -241,6 +751,166 @@ class AudioProfanityDetector:
             logger.error(f"Error in audio profanity detection: {e}")
             return []
 
+    async def _detect_windows(
+        self,
+        chunks: AsyncIterator[np.ndarray],
+        sample_rate: int,
+        confidence_threshold: float = 0.8,
+        profanity_list: List[str] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Group streamed audio into overlapping windows and detect profanity per window
+
+        Each window is stream_window_seconds of new audio preceded by the last
+        stream_overlap_seconds of the previous window, so words cut at a
+        boundary are heard whole. Overlapping audio is reported by exactly one
+        window: the boundary is the middle of the overlap. A window is only
+        cut once audio beyond it (or the end of the stream) has arrived, so
+        the final window always reports up to the end of the stream.
+
+        Args:
+            chunks: Mono float32 sample arrays (at sample_rate)
+            sample_rate: Sample rate of the chunks
+            confidence_threshold: Minimum confidence for detection
+            profanity_list: Custom list of profane words
+
+        Yields:
+            Per-window result with start/end offsets (seconds) of the new
+            audio and detections
+        """
+        window_samples = max(1, int(self.stream_window_seconds * sample_rate))
+        overlap_samples = int(self.stream_overlap_seconds * sample_rate)
+
+        pending: List[np.ndarray] = []
+        pending_samples = 0
+        context = np.zeros(0, dtype=np.float32)
+        offset = 0
+        done = False
+        iterator = chunks.__aiter__()
+
+        while not done:
+            try:
+                chunk = await iterator.__anext__()
+                pending.append(chunk)
+                pending_samples += len(chunk)
+            except StopAsyncIteration:
+                done = True
+
+            # Full windows followed by more audio, or whatever is left once
+            # the stream ends (an exactly full window waits to learn whether
+            # it is the last one, which reports its whole tail)
+            while pending_samples > window_samples or (done and pending_samples > 0):
+                buffered = np.concatenate(pending) if len(pending) > 1 else pending[0]
+                new_audio = buffered[:window_samples]
+                rest = buffered[window_samples:]
+                pending = [rest] if len(rest) else []
+                pending_samples = len(rest)
+
+                start = offset / sample_rate
+                offset += len(new_audio)
+                end = offset / sample_rate
+                last = done and pending_samples == 0
+
+                window = np.concatenate([context, new_audio]) if len(context) else new_audio
+                window_start = start - len(context) / sample_rate
+                report_from = start - len(context) / sample_rate / 2
+
+                context = window[-overlap_samples:] if overlap_samples else context
+                report_to = end if last else end - len(context) / sample_rate / 2
+
+                pcm = (np.clip(window, -1.0, 1.0) * 32767).astype('<i2').tobytes()
+
+                detections = await self._detect_audio(
+                    window,
+                    self._pcm_to_wav(pcm, sample_rate),
+                    confidence_threshold,
+                    profanity_list,
+                    time_offset=window_start,
+                    sample_rate=sample_rate,
+                    report_range=(report_from, report_to)
+                )
+
+                yield {
+                    "start": start,
+                    "end": end,
+                    "profanity_detected": len(detections) > 0,
+                    "detections": detections
+                }
+
+    async def detect_stream(
+        self,
+        queue: asyncio.Queue,
+        confidence_threshold: float = 0.8,
+        profanity_list: List[str] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Detect profanity in raw PCM as it arrives
+
+        Consumes 16-bit little-endian mono PCM chunks (at stream_sample_rate)
+        from a queue filled by the uploader, and transcribes each window as
+        soon as it is complete, so detection starts before the upload ends.
+        Other rates are resampled to 16 kHz (FFmpeg via PyAV) on the way in,
+        like decoded uploads.
+
+        Args:
+            queue: Queue of PCM byte chunks, terminated by None
+            confidence_threshold: Minimum confidence for detection
+            profanity_list: Custom list of profane words
+
+        Yields:
+            Per-window result with start/end offsets (seconds) and detections
+        """
+        resampler = None
+        if self.stream_sample_rate != WHISPER_SAMPLE_RATE:
+            import av
+            resampler = av.AudioResampler(format='flt', layout='mono', rate=WHISPER_SAMPLE_RATE)
+
+        def resample(samples: Optional[np.ndarray]) -> List[np.ndarray]:
+            """Resample int16 samples (None drains the resampler) to 16 kHz float32"""
+            frame = None
+            if samples is not None:
+                frame = av.AudioFrame.from_ndarray(samples.reshape(1, -1), format='s16', layout='mono')
+                frame.sample_rate = self.stream_sample_rate
+
+            return [resampled.to_ndarray().reshape(-1) for resampled in resampler.resample(frame)]
+
+        async def pcm_chunks():
+            carry = b''
+
+            while True:
+                chunk = await queue.get()
+                if chunk is None:
+                    break
+
+                # Samples may be split across chunks
+                data = carry + chunk if carry else chunk
+                usable = len(data) - len(data) % 2
+                carry = bytes(data[usable:])
+
+                if not usable:
+                    continue
+
+                samples = np.frombuffer(data, dtype='<i2', count=usable // 2)
+
+                if resampler is None:
+                    yield samples.astype(np.float32) / 32768.0
+                else:
+                    for resampled in resample(samples):
+                        yield resampled
+
+            # Samples buffered inside the resampler
+            if resampler is not None:
+                for resampled in resample(None):
+                    yield resampled
+
+        async for window in self._detect_windows(
+            pcm_chunks(),
+            WHISPER_SAMPLE_RATE,
+            confidence_threshold,
+            profanity_list
+        ):
+            yield window
+
     async def detect_streaming(
         self,
         audio_stream,
@@ -250,23 +920,43 @@ class AudioProfanityDetector:
         """
         Detect profanity in streaming audio (generator function)
 
+        Encoded chunks are decoded as they arrive and transcribed in the same
+        overlapping windows as detect_stream rather than one Whisper call each.
+
         Args:
-            audio_stream: Audio stream iterator
-            chunk_duration: Duration of each chunk in seconds
+            audio_stream: Audio stream iterator (encoded audio chunks)
+            chunk_duration: Unused, kept for compatibility (window length is
+                AUDIO_STREAM_WINDOW_SECONDS)
             profanity_list: Custom profanity list
 
         Yields:
-            Profanity detections for each chunk
+            Profanity detections for each window
         """
-        async for audio_chunk in audio_stream:
-            detections = await self.detect(audio_chunk, profanity_list=profanity_list)
-            yield detections
+        async def decoded_chunks():
+            loop = asyncio.get_event_loop()
+
+            async for audio_chunk in audio_stream:
+                audio_data = await loop.run_in_executor(
+                    None,
+                    self._extract_audio_from_bytes,
+                    audio_chunk
+                )
+                if audio_data is not None and len(audio_data):
+                    yield audio_data
+
+        async for window in self._detect_windows(
+            decoded_chunks(),
+            WHISPER_SAMPLE_RATE,
+            profanity_list=profanity_list
+        ):
+            yield window['detections']
 
     def add_custom_words(self, words: List[str]):
         """Add custom words to profanity filter"""
         if self.profanity_filter:
             for word in words:
                 self.profanity_filter.add_censor_words([word])
+            self._compile_profanity_pattern()
             logger.info(f"Added {len(words)} custom profane words")
 
     def remove_words(self, words: List[str]):
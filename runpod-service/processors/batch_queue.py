@@ -0,0 +1,105 @@
+"""
+Batched Inference Queue
+Groups concurrent NSFW detection requests across sessions into batched calls
+"""
+
+import os
+import logging
+import asyncio
+from typing import List, Dict, Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class BatchedInferenceQueue:
+    """Collects frames from concurrent requests and runs them as one batch"""
+
+    def __init__(self, nsfw_detector):
+        self.nsfw_detector = nsfw_detector
+        self.max_batch_size = int(os.getenv('NSFW_BATCH_SIZE', 8))
+        self.max_wait_ms = float(os.getenv('NSFW_BATCH_MAX_WAIT_MS', 5))
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker: Optional[asyncio.Task] = None
+        logger.info(
+            f"BatchedInferenceQueue initialized "
+            f"(max batch: {self.max_batch_size}, max wait: {self.max_wait_ms}ms)"
+        )
+
+    def start(self):
+        """Start the background batching worker (requires a running loop)"""
+        self.queue = asyncio.Queue()
+        self.worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background worker"""
+        if self.worker is not None:
+            self.worker.cancel()
+            await asyncio.gather(self.worker, return_exceptions=True)
+            self.worker = None
+
+    async def submit(
+        self,
+        frame: np.ndarray,
+        confidence_threshold: float = 0.85
+    ) -> List[Dict]:
+        """
+        Queue a frame for batched NSFW detection
+
+        Args:
+            frame: Input video frame (BGR format)
+            confidence_threshold: Minimum confidence for detection (0-1)
+
+        Returns:
+            List of detection dictionaries for this frame
+        """
+        future = asyncio.get_event_loop().create_future()
+        await self.queue.put((frame, confidence_threshold, future))
+        return await future
+
+    async def _collect_batch(self) -> List[tuple]:
+        """Wait for one request, then gather more until full or timed out"""
+        loop = asyncio.get_event_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.max_wait_ms / 1000
+
+        while len(batch) < self.max_batch_size:
+            # Drain anything already queued without waiting
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        """Background worker: collect, infer, and resolve per-frame futures"""
+        while True:
+            batch = await self._collect_batch()
+
+            frames = [frame for frame, _, _ in batch]
+            thresholds = [threshold for _, threshold, _ in batch]
+
+            try:
+                # Run at the loosest threshold, then filter per request
+                results = await self.nsfw_detector.detect_batch(frames, min(thresholds))
+
+                for (_, threshold, future), detections in zip(batch, results):
+                    if not future.done():
+                        future.set_result([
+                            d for d in detections if d['confidence'] >= threshold
+                        ])
+
+            except Exception as e:
+                logger.error(f"Error in batched NSFW inference: {e}")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
@@ -1,17 +1,115 @@
 """
 Blur Applicator
-Applies Gaussian blur to detected regions in video frames
+Applies Gaussian blur to detected regions in video frames (CUDA when available)
 """
 
 import os
+import math
 import logging
 import asyncio
-from typing import List, Dict
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
 import numpy as np
 import cv2
 
+from .cuda_streams import current_stream
+
 logger = logging.getLogger(__name__)
 
+# OpenCV's CUDA Gaussian filter only supports kernels up to 32 pixels;
+# larger blurs run as several passes of this size
+CUDA_MAX_KERNEL_SIZE = 31
+
+# Blur strength multiplier per censorship level
+LEVEL_MULTIPLIERS = {
+    'critical': 1.0,
+    'high': 0.9,
+    'medium': 0.7,
+    'low': 0.5
+}
+
+
+# Mask box edges snap to this grid so near-identical boxes share a cache entry
+MASK_GRID = 4
+
+
+@lru_cache(maxsize=int(os.getenv('BLUR_MASK_CACHE_SIZE', 8)))
+def _build_feathered_mask(
+    height: int,
+    width: int,
+    rects: tuple,
+    feather_amount: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build one mask covering all rects, feathered for smooth blur transitions
+
+    The mask is built and feathered as uint8 (three box-filter passes
+    approximate a Gaussian at a quarter of the memory traffic) and only
+    converted to float32 weights at the end. Cached, so the arrays are
+    returned read-only.
+    """
+    mask = np.zeros((height, width), dtype=np.uint8)
+
+    for x, y, x2, y2 in rects:
+        mask[y:y2, x:x2] = 255
+
+    # Repeated box blurs converge on a Gaussian and cost O(HW) per pass
+    # regardless of kernel size
+    if feather_amount > 0:
+        kernel = (feather_amount, feather_amount)
+        for _ in range(3):
+            cv2.boxFilter(mask, -1, kernel, dst=mask)
+
+    weights = mask.astype(np.float32)
+    weights *= 1.0 / 255
+    inverse = 1.0 - weights
+
+    weights.flags.writeable = False
+    inverse.flags.writeable = False
+
+    return weights, inverse
+
+
+def _kernel_variance(kernel_size: int, sigma: float) -> float:
+    """Variance (in pixels^2) of OpenCV's truncated 1-D Gaussian kernel"""
+    kernel = cv2.getGaussianKernel(kernel_size, sigma).ravel()
+    offsets = np.arange(kernel_size) - kernel_size // 2
+    return float(np.dot(kernel, offsets * offsets))
+
+
+@lru_cache(maxsize=64)
+def _cuda_blur_passes(kernel_size: int, sigma: float) -> Tuple[int, int, float]:
+    """
+    Split a Gaussian blur too wide for the CUDA filter into repeated passes
+
+    Variances add under convolution, so n passes of a CUDA_MAX_KERNEL_SIZE
+    kernel carrying 1/n of the requested kernel's variance blur as strongly
+    as the single CPU pass.
+
+    Returns:
+        (passes, kernel_size, sigma) for the CUDA filter
+    """
+    if kernel_size <= CUDA_MAX_KERNEL_SIZE:
+        return 1, kernel_size, sigma
+
+    target = _kernel_variance(kernel_size, sigma)
+
+    # Widest a single pass gets: the sigma -> infinity (box) limit
+    widest = _kernel_variance(CUDA_MAX_KERNEL_SIZE, 1e4)
+    passes = math.ceil(target / widest - 1e-9)
+    pass_variance = target / passes
+
+    # Kernel variance grows monotonically with sigma: bisect for it
+    low, high = 0.1, 1e4
+    for _ in range(50):
+        middle = (low + high) / 2
+        if _kernel_variance(CUDA_MAX_KERNEL_SIZE, middle) < pass_variance:
+            low = middle
+        else:
+            high = middle
+
+    return passes, CUDA_MAX_KERNEL_SIZE, high
+
 
 class BlurApplicator:
     """Applies blur to detected regions with smooth transitions"""
@@ -24,11 +122,217 @@ class BlurApplicator:
         if self.kernel_size % 2 == 0:
             self.kernel_size += 1
 
+        # Switch from per-region blur to one masked full-frame blur once the
+        # Gaussian boxes cover this fraction of the frame
+        self.full_frame_min_area = float(os.getenv('BLUR_FULL_FRAME_MIN_AREA', 0.9))
+
+        # Many boxes packed into a small area: blur their bounding union once
+        # and copy each box out, instead of one call (and border pass) per box
+        self.union_min_boxes = int(os.getenv('BLUR_UNION_MIN_BOXES', 5))
+        self.union_max_area = float(os.getenv('BLUR_UNION_MAX_AREA', 0.1))
+        self.union_min_density = float(os.getenv('BLUR_UNION_MIN_DENSITY', 0.4))
+
+        # CUDA filters are cached per (kernel, sigma) and reuse the same
+        # device buffers, so steady-state frames do not allocate
+        self.use_gpu = False
+        self._gpu_filters: Dict[tuple, object] = {}
+        self._gpu_region = None
+        self._gpu_blurred = None
+        self._init_gpu()
+
         logger.info(
             f"BlurApplicator initialized "
-            f"(kernel: {self.kernel_size}, sigma: {self.sigma})"
+            f"(kernel: {self.kernel_size}, sigma: {self.sigma}, gpu: {self.use_gpu})"
         )
 
+    def _init_gpu(self):
+        """Enable CUDA blur if OpenCV was built with CUDA and a device is present"""
+        if os.getenv('BLUR_USE_GPU', 'auto').lower() in ('false', '0', 'no'):
+            return
+
+        try:
+            if cv2.cuda.getCudaEnabledDeviceCount() > 0:
+                self._gpu_region = cv2.cuda_GpuMat()
+                self._gpu_blurred = cv2.cuda_GpuMat()
+                self.use_gpu = True
+                logger.info("CUDA blur enabled")
+
+        except Exception as e:
+            logger.warning(f"CUDA blur not available: {e}")
+
+    def _get_gpu_filter(self, kernel_size: int, sigma: float):
+        """Get (or create) a cached CUDA Gaussian filter"""
+        key = (kernel_size, round(sigma, 2))
+        gpu_filter = self._gpu_filters.get(key)
+
+        if gpu_filter is None:
+            gpu_filter = cv2.cuda.createGaussianFilter(
+                cv2.CV_8UC3,
+                cv2.CV_8UC3,
+                (kernel_size, kernel_size),
+                key[1]
+            )
+            self._gpu_filters[key] = gpu_filter
+
+        return gpu_filter
+
+    def _gaussian_blur_gpu(
+        self,
+        region: np.ndarray,
+        kernel_size: int,
+        sigma: float
+    ) -> np.ndarray:
+        """
+        Blur a region on the GPU, uploading only the region's pixels
+
+        Uses the stream (and buffers) borrowed by the current task from the
+        StreamPool, or the default stream when none is held.
+        """
+        passes, kernel_size, sigma = _cuda_blur_passes(kernel_size, sigma)
+        gpu_filter = self._get_gpu_filter(kernel_size, sigma)
+        slot = current_stream.get()
+
+        if slot is None:
+            stream = cv2.cuda.Stream_Null()
+            gpu_region, gpu_blurred = self._gpu_region, self._gpu_blurred
+        else:
+            stream = slot.stream
+            gpu_region = slot.buffer('blur_region')
+            gpu_blurred = slot.buffer('blur_output')
+
+        gpu_region.upload(region, stream)
+
+        # Ping-pong between the two buffers for multi-pass blurs
+        for _ in range(passes):
+            gpu_filter.apply(gpu_region, gpu_blurred, stream)
+            gpu_region, gpu_blurred = gpu_blurred, gpu_region
+
+        blurred_region = gpu_region.download(stream)
+        stream.waitForCompletion()
+
+        return blurred_region
+
+    def _gpu_stream(self):
+        """Stream borrowed by the current task, or the default stream"""
+        slot = current_stream.get()
+        if slot is None:
+            return cv2.cuda.Stream_Null(), self._gpu_blurred
+        return slot.stream, slot.buffer('blur_output')
+
+    def _gpu_roi(self, gpu_frame, bbox: Dict):
+        """Clip a bbox to a device frame and return a view of that region (or None)"""
+        width, height = gpu_frame.size()
+
+        x = max(0, bbox['x'])
+        y = max(0, bbox['y'])
+        x2 = min(width, bbox['x'] + bbox['width'])
+        y2 = min(height, bbox['y'] + bbox['height'])
+
+        if x >= x2 or y >= y2:
+            return None
+
+        # Header into the frame's device memory, no copy
+        return gpu_frame.rowRange(y, y2).colRange(x, x2)
+
+    def _apply_gaussian_blur_gpu(
+        self,
+        gpu_frame,
+        bbox: Dict,
+        blur_strength: float = 1.0
+    ):
+        """Apply Gaussian blur to a region of a frame already on the GPU"""
+        region = self._gpu_roi(gpu_frame, bbox)
+        if region is None:
+            return gpu_frame
+
+        kernel_size = int(self.kernel_size * blur_strength)
+        if kernel_size % 2 == 0:
+            kernel_size += 1
+        passes, kernel_size, sigma = _cuda_blur_passes(kernel_size, self.sigma * blur_strength)
+
+        gpu_filter = self._get_gpu_filter(kernel_size, sigma)
+        stream, gpu_blurred = self._gpu_stream()
+
+        # Ping-pong between the region and the scratch buffer; an odd pass
+        # count leaves the result in the scratch buffer
+        source, target = region, gpu_blurred
+        for _ in range(passes):
+            gpu_filter.apply(source, target, stream)
+            source, target = target, source
+
+        if source is not region:
+            gpu_blurred.copyTo(stream, region)
+
+        return gpu_frame
+
+    def _apply_pixelate_gpu(
+        self,
+        gpu_frame,
+        bbox: Dict,
+        pixel_size: int = 15
+    ):
+        """Apply pixelation to a region of a frame already on the GPU"""
+        region = self._gpu_roi(gpu_frame, bbox)
+        if region is None:
+            return gpu_frame
+
+        region_width, region_height = region.size()
+        stream, _ = self._gpu_stream()
+
+        small_region = cv2.cuda.resize(
+            region,
+            (max(1, region_width // pixel_size), max(1, region_height // pixel_size)),
+            interpolation=cv2.INTER_LINEAR,
+            stream=stream
+        )
+        cv2.cuda.resize(
+            small_region,
+            (region_width, region_height),
+            region,
+            interpolation=cv2.INTER_NEAREST,
+            stream=stream
+        )
+
+        return gpu_frame
+
+    def _apply_black_box_gpu(
+        self,
+        gpu_frame,
+        bbox: Dict,
+        alpha: float = 0.8
+    ):
+        """Darken a region of a frame already on the GPU"""
+        region = self._gpu_roi(gpu_frame, bbox)
+        if region is None:
+            return gpu_frame
+
+        stream, _ = self._gpu_stream()
+        cv2.cuda.addWeighted(region, 1 - alpha, region, 0, 0, region, stream=stream)
+
+        return gpu_frame
+
+    def _apply_blur_gpu_mat(self, gpu_frame, detections: List[Dict]):
+        """
+        Censor a frame that already lives in GPU memory
+
+        Every region is filtered through a view into the device frame, so
+        nothing crosses PCIe; the caller downloads (or encodes) the result.
+        """
+        for detection in detections:
+            bbox = detection['bbox']
+            blur_method = self._get_blur_method(detection)
+            blur_strength = self._get_blur_strength(detection)
+
+            if blur_method == 'blur':
+                self._apply_gaussian_blur_gpu(gpu_frame, bbox, blur_strength)
+            elif blur_method == 'pixelate':
+                pixel_size = max(5, int(20 * (1 - blur_strength)))
+                self._apply_pixelate_gpu(gpu_frame, bbox, pixel_size)
+            elif blur_method == 'black_box':
+                self._apply_black_box_gpu(gpu_frame, bbox, alpha=0.9)
+
+        return gpu_frame
+
     def _apply_gaussian_blur(
         self,
         frame: np.ndarray,
@@ -48,22 +352,28 @@ class BlurApplicator:
         if x >= x2 or y >= y2:
             return frame
 
-        # Extract region
-        region = frame[y:y2, x:x2].copy()
+        # View into the frame, no copy
+        region = frame[y:y2, x:x2]
 
         # Apply Gaussian blur
         kernel_size = int(self.kernel_size * blur_strength)
         if kernel_size % 2 == 0:
             kernel_size += 1
 
-        blurred_region = cv2.GaussianBlur(
-            region,
-            (kernel_size, kernel_size),
-            self.sigma * blur_strength
-        )
-
-        # Replace region in frame
-        frame[y:y2, x:x2] = blurred_region
+        if self.use_gpu and region.ndim == 3 and region.shape[2] == 3:
+            region[:] = self._gaussian_blur_gpu(
+                region,
+                kernel_size,
+                self.sigma * blur_strength
+            )
+        else:
+            # Separable filter supports src aliasing dst: blurs in place
+            cv2.GaussianBlur(
+                region,
+                (kernel_size, kernel_size),
+                self.sigma * blur_strength,
+                dst=region
+            )
 
         return frame
 
@@ -84,8 +394,8 @@ class BlurApplicator:
         if x >= x2 or y >= y2:
             return frame
 
-        # Extract region
-        region = frame[y:y2, x:x2].copy()
+        # View into the frame, no copy
+        region = frame[y:y2, x:x2]
 
         # Get region dimensions
         region_height, region_width = region.shape[:2]
@@ -93,20 +403,18 @@ class BlurApplicator:
         # Downsample
         small_region = cv2.resize(
             region,
-            (region_width // pixel_size, region_height // pixel_size),
+            (max(1, region_width // pixel_size), max(1, region_height // pixel_size)),
             interpolation=cv2.INTER_LINEAR
         )
 
-        # Upsample back
-        pixelated_region = cv2.resize(
+        # Upsample back straight into the frame
+        cv2.resize(
             small_region,
             (region_width, region_height),
+            dst=region,
             interpolation=cv2.INTER_NEAREST
         )
 
-        # Replace region
-        frame[y:y2, x:x2] = pixelated_region
-
         return frame
 
     def _apply_black_box(
@@ -126,87 +434,217 @@ class BlurApplicator:
         if x >= x2 or y >= y2:
             return frame
 
-        # Create overlay
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (x, y), (x2, y2), (0, 0, 0), -1)
-
-        # Blend with original
-        frame = cv2.addWeighted(frame, 1 - alpha, overlay, alpha, 0)
+        # Blending with black only scales the region; no full-frame overlay
+        region = frame[y:y2, x:x2]
+        cv2.convertScaleAbs(region, dst=region, alpha=1 - alpha)
 
         return frame
 
     def _create_feathered_mask(
         self,
         shape: tuple,
-        bbox: Dict,
+        bboxes: List[Dict],
         feather_amount: int = 10
-    ) -> np.ndarray:
-        """Create feathered mask for smooth blur transitions"""
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the feathered mask covering all boxes, and its inverse
+
+        Box edges are snapped outward to MASK_GRID pixels so the slightly
+        moving boxes of consecutive frames hit the same cached mask.
+
+        Returns:
+            (weights, 1 - weights) as read-only float32 arrays
+        """
         height, width = shape[:2]
-        mask = np.zeros((height, width), dtype=np.float32)
+        rects = []
 
-        x = max(0, bbox['x'])
-        y = max(0, bbox['y'])
-        x2 = min(width, bbox['x'] + bbox['width'])
-        y2 = min(height, bbox['y'] + bbox['height'])
+        for bbox in bboxes:
+            x = max(0, bbox['x']) // MASK_GRID * MASK_GRID
+            y = max(0, bbox['y']) // MASK_GRID * MASK_GRID
+            x2 = min(width, -(-(bbox['x'] + bbox['width']) // MASK_GRID) * MASK_GRID)
+            y2 = min(height, -(-(bbox['y'] + bbox['height']) // MASK_GRID) * MASK_GRID)
+
+            if x < x2 and y < y2:
+                rects.append((x, y, x2, y2))
+
+        return _build_feathered_mask(height, width, tuple(sorted(rects)), feather_amount)
+
+    def _apply_gaussian_blur_masked(
+        self,
+        frame: np.ndarray,
+        detections: List[Dict],
+        use_feathering: bool = True
+    ) -> np.ndarray:
+        """
+        Blur many regions with one full-frame Gaussian and a mask composite
+
+        One large separable blur beats many per-ROI calls once the boxes
+        cover most of the frame. Uses the strongest blur requested by any box.
+        """
+        blur_strength = max(self._get_blur_strength(d) for d in detections)
+
+        kernel_size = int(self.kernel_size * blur_strength)
+        if kernel_size % 2 == 0:
+            kernel_size += 1
+
+        blurred = cv2.GaussianBlur(frame, (kernel_size, kernel_size), self.sigma * blur_strength)
+
+        mask, inverse_mask = self._create_feathered_mask(
+            frame.shape,
+            [d['bbox'] for d in detections],
+            feather_amount=10 if use_feathering else 0
+        )
+
+        # out = blurred * mask + frame * (1 - mask), written back into frame
+        cv2.blendLinear(blurred, frame, mask, inverse_mask, dst=frame)
+
+        return frame
+
+    def _dense_union(
+        self,
+        bboxes: List[Dict],
+        frame_shape: tuple,
+        covered_area: int
+    ) -> Optional[tuple]:
+        """
+        Bounding union of the boxes if it is small and mostly covered by them
+
+        Returns:
+            (x, y, x2, y2) of the union, or None if per-box blurring is cheaper
+        """
+        height, width = frame_shape[:2]
+
+        rects = np.array(
+            [[b['x'], b['y'], b['x'] + b['width'], b['y'] + b['height']] for b in bboxes]
+        )
+        x, y = np.maximum(rects[:, :2].min(axis=0), 0)
+        x2 = min(int(rects[:, 2].max()), width)
+        y2 = min(int(rects[:, 3].max()), height)
 
         if x >= x2 or y >= y2:
-            return mask
+            return None
+
+        union_area = (x2 - x) * (y2 - y)
+
+        if (union_area > self.union_max_area * height * width or
+                covered_area < self.union_min_density * union_area):
+            return None
+
+        return int(x), int(y), x2, y2
+
+    def _apply_gaussian_blur_union(
+        self,
+        frame: np.ndarray,
+        detections: List[Dict],
+        union: tuple
+    ) -> np.ndarray:
+        """Blur the union of many nearby boxes once and copy each box from it"""
+        ux, uy, ux2, uy2 = union
+        height, width = frame.shape[:2]
+
+        blur_strength = max(self._get_blur_strength(d) for d in detections)
+
+        kernel_size = int(self.kernel_size * blur_strength)
+        if kernel_size % 2 == 0:
+            kernel_size += 1
 
-        # Create solid region
-        mask[y:y2, x:x2] = 1.0
+        region = frame[uy:uy2, ux:ux2]
 
-        # Apply Gaussian blur to create feathered edges
-        if feather_amount > 0:
-            mask = cv2.GaussianBlur(mask, (feather_amount * 2 + 1, feather_amount * 2 + 1), 0)
+        if self.use_gpu and region.ndim == 3 and region.shape[2] == 3:
+            blurred = self._gaussian_blur_gpu(region, kernel_size, self.sigma * blur_strength)
+        else:
+            blurred = cv2.GaussianBlur(
+                region,
+                (kernel_size, kernel_size),
+                self.sigma * blur_strength
+            )
+
+        for detection in detections:
+            bbox = detection['bbox']
+            x = max(0, bbox['x'])
+            y = max(0, bbox['y'])
+            x2 = min(width, bbox['x'] + bbox['width'])
+            y2 = min(height, bbox['y'] + bbox['height'])
+
+            if x < x2 and y < y2:
+                frame[y:y2, x:x2] = blurred[y - uy:y2 - uy, x - ux:x2 - ux]
 
-        return mask
+        return frame
 
     def _merge_overlapping_boxes(self, detections: List[Dict]) -> List[Dict]:
-        """Merge overlapping bounding boxes for more efficient blurring"""
+        """
+        Merge overlapping bounding boxes for more efficient blurring
+
+        Boxes are merged transitively (A-B-C chains collapse into one box even
+        if A and C do not touch). A sweep over boxes sorted by left edge only
+        tests pairs whose x ranges overlap, and a union-find groups them.
+        """
         if len(detections) <= 1:
             return detections
 
-        # Sort by x coordinate
-        sorted_detections = sorted(detections, key=lambda d: d['bbox']['x'])
+        rects = np.array(
+            [
+                [
+                    d['bbox']['x'],
+                    d['bbox']['y'],
+                    d['bbox']['x'] + d['bbox']['width'],
+                    d['bbox']['y'] + d['bbox']['height']
+                ]
+                for d in detections
+            ],
+            dtype=np.int64
+        )
 
-        merged = []
-        current = sorted_detections[0].copy()
-
-        for detection in sorted_detections[1:]:
-            # Check if bounding boxes overlap
-            curr_bbox = current['bbox']
-            det_bbox = detection['bbox']
-
-            if (curr_bbox['x'] + curr_bbox['width'] >= det_bbox['x'] and
-                curr_bbox['y'] + curr_bbox['height'] >= det_bbox['y'] and
-                curr_bbox['y'] <= det_bbox['y'] + det_bbox['height']):
-
-                # Merge bounding boxes
-                x_min = min(curr_bbox['x'], det_bbox['x'])
-                y_min = min(curr_bbox['y'], det_bbox['y'])
-                x_max = max(
-                    curr_bbox['x'] + curr_bbox['width'],
-                    det_bbox['x'] + det_bbox['width']
-                )
-                y_max = max(
-                    curr_bbox['y'] + curr_bbox['height'],
-                    det_bbox['y'] + det_bbox['height']
-                )
+        order = np.argsort(rects[:, 0], kind='stable')
+        rects = rects[order]
+
+        parent = list(range(len(rects)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        # Boxes after i whose left edge starts before i's right edge
+        x_ends = np.searchsorted(rects[:, 0], rects[:, 2], side='left')
 
-                current['bbox'] = {
-                    'x': x_min,
-                    'y': y_min,
-                    'width': x_max - x_min,
-                    'height': y_max - y_min
-                }
+        for i in range(len(rects) - 1):
+            candidates = np.arange(i + 1, x_ends[i])
+            if candidates.size == 0:
+                continue
 
-            else:
-                # No overlap, add current and start new
-                merged.append(current)
-                current = detection.copy()
+            # x ranges overlap by construction; check y ranges
+            overlap = (
+                (rects[candidates, 1] < rects[i, 3]) &
+                (rects[i, 1] < rects[candidates, 3])
+            )
 
-        merged.append(current)
+            root_i = find(i)
+            for j in candidates[overlap]:
+                root_j = find(int(j))
+                if root_j != root_i:
+                    parent[root_j] = root_i
+
+        roots = np.array([find(i) for i in range(len(rects))])
+        if len(np.unique(roots)) == len(rects):
+            return detections
+
+        merged = []
+        for root in np.unique(roots):
+            members = np.flatnonzero(roots == root)
+            x_min, y_min = rects[members, :2].min(axis=0)
+            x_max, y_max = rects[members, 2:].max(axis=0)
+
+            # Keep the metadata of the leftmost box in the group
+            detection = detections[order[members[0]]].copy()
+            detection['bbox'] = {
+                'x': int(x_min),
+                'y': int(y_min),
+                'width': int(x_max - x_min),
+                'height': int(y_max - y_min)
+            }
+            merged.append(detection)
 
         logger.debug(f"Merged {len(detections)} boxes into {len(merged)}")
 
@@ -221,14 +659,7 @@ class BlurApplicator:
         base_strength = min(confidence * 1.2, 1.0)
 
         # Adjust based on censorship level
-        level_multipliers = {
-            'critical': 1.0,
-            'high': 0.9,
-            'medium': 0.7,
-            'low': 0.5
-        }
-
-        multiplier = level_multipliers.get(censorship_level, 0.7)
+        multiplier = LEVEL_MULTIPLIERS.get(censorship_level, 0.7)
 
         return base_strength * multiplier
 
@@ -252,16 +683,19 @@ class BlurApplicator:
         frame: np.ndarray,
         detections: List[Dict],
         use_feathering: bool = True,
-        merge_overlaps: bool = True
+        merge_overlaps: bool = True,
+        in_place: bool = False
     ) -> np.ndarray:
         """
         Apply blur to all detected regions in frame
 
         Args:
-            frame: Input video frame
+            frame: Input video frame (numpy array, or cv2.cuda_GpuMat to
+                blur on-device when CUDA blur is enabled)
             detections: List of detections with bounding boxes
             use_feathering: Apply feathered edges for smooth transitions
             merge_overlaps: Merge overlapping bounding boxes
+            in_place: Blur the caller's frame directly instead of a copy
 
         Returns:
             Blurred frame
@@ -280,16 +714,61 @@ class BlurApplicator:
             if merge_overlaps:
                 blur_detections = self._merge_overlapping_boxes(blur_detections)
 
-            # Work on a copy
-            blurred_frame = frame.copy()
+            # Frames decoded on the GPU stay there: blur each region on-device
+            if self.use_gpu and isinstance(frame, cv2.cuda_GpuMat):
+                blurred_frame = frame if in_place else frame.clone()
+                blurred_frame = self._apply_blur_gpu_mat(blurred_frame, blur_detections)
+                logger.debug(f"Applied GPU blur to {len(blur_detections)} region(s)")
+                return blurred_frame
+
+            # Copy only if the caller still needs the original
+            blurred_frame = frame if in_place else frame.copy()
+
+            # Gaussian regions covering most of the frame: one full-frame
+            # blur + mask composite instead of a call per region
+            gaussian_detections = [
+                d for d in blur_detections if self._get_blur_method(d) == 'blur'
+            ]
+            covered_area = sum(
+                d['bbox']['width'] * d['bbox']['height'] for d in gaussian_detections
+            )
+            frame_area = frame.shape[0] * frame.shape[1]
+            use_masked_blur = (
+                len(gaussian_detections) > 1 and
+                covered_area >= self.full_frame_min_area * frame_area
+            )
+
+            # Many small boxes clustered together: one blur over their union
+            union = None
+            if not use_masked_blur and len(gaussian_detections) >= self.union_min_boxes:
+                union = self._dense_union(
+                    [d['bbox'] for d in gaussian_detections],
+                    frame.shape,
+                    covered_area
+                )
+
+            if use_masked_blur:
+                blurred_frame = self._apply_gaussian_blur_masked(
+                    blurred_frame,
+                    gaussian_detections,
+                    use_feathering
+                )
+            elif union is not None:
+                blurred_frame = self._apply_gaussian_blur_union(
+                    blurred_frame,
+                    gaussian_detections,
+                    union
+                )
 
-            # Apply blur to each detection
+            # Apply blur to each remaining detection
             for detection in blur_detections:
                 bbox = detection['bbox']
                 blur_method = self._get_blur_method(detection)
                 blur_strength = self._get_blur_strength(detection)
 
                 if blur_method == 'blur':
+                    if use_masked_blur or union is not None:
+                        continue  # Already blurred by the masked/union pass
                     blurred_frame = self._apply_gaussian_blur(
                         blurred_frame,
                         bbox,
@@ -6,91 +6,302 @@ Uses NudeNet model for nudity and inappropriate content detection
 import os
 import logging
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict
 import numpy as np
 import cv2
 
 logger = logging.getLogger(__name__)
 
+# NudeNet's own score and IoU thresholds for its NMS step
+NUDENET_MIN_SCORE = 0.25
+NUDENET_NMS_IOU = 0.45
+
+# Dedicated inference thread: one CUDA context user instead of many default-
+# pool threads contending for the GPU (batching already fills each call)
+_nsfw_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('NSFW_EXECUTOR_WORKERS', 1)),
+    thread_name_prefix='nsfw'
+)
+
+# Labels by censorship level (NudeNet 2.x names, then the 3.x names the
+# bundled model emits)
+CRITICAL_LABELS = frozenset({
+    'EXPOSED_GENITALIA_F',
+    'EXPOSED_GENITALIA_M',
+    'EXPOSED_BREAST_F',
+    'EXPOSED_ANUS',
+    'FEMALE_GENITALIA_EXPOSED',
+    'MALE_GENITALIA_EXPOSED',
+    'FEMALE_BREAST_EXPOSED',
+    'ANUS_EXPOSED'
+})
+
+HIGH_LABELS = frozenset({
+    'EXPOSED_BUTTOCKS',
+    'EXPOSED_BREAST_M',
+    'BUTTOCKS_EXPOSED',
+    'MALE_BREAST_EXPOSED'
+})
+
 
 class NSFWDetector:
     """Detects NSFW content (nudity, explicit imagery) in video frames"""
 
     def __init__(self):
-        self.detector = None
+        self.session = None
+        self.input_name = None
+        self.input_size = int(os.getenv('NSFW_INPUT_SIZE', 320))
+        self.padding = int(os.getenv('BLUR_PADDING', 10))
+        self.labels = None
         self._load_model()
         logger.info("NSFWDetector initialized")
 
+    def _get_providers(self, available: List[str]) -> List:
+        """
+        Build the ONNX Runtime execution provider list from NSFW_EXECUTION_PROVIDER
+
+        tensorrt and openvino are opt-in: TensorRT builds an engine on first
+        use (cached on disk afterwards) and OpenVINO targets Intel CPUs/iGPUs.
+        """
+        requested = os.getenv('NSFW_EXECUTION_PROVIDER', 'auto').lower()
+        providers = []
+
+        if requested == 'tensorrt' and 'TensorrtExecutionProvider' in available:
+            int8 = os.getenv('NSFW_TRT_INT8', 'false').lower() == 'true'
+            providers.append((
+                'TensorrtExecutionProvider',
+                {
+                    'trt_fp16_enable': True,
+                    'trt_int8_enable': int8,
+                    'trt_engine_cache_enable': True,
+                    'trt_engine_cache_path': os.getenv('NSFW_TRT_CACHE_DIR', '/app/models/trt_cache')
+                }
+            ))
+
+        if requested == 'openvino' and 'OpenVINOExecutionProvider' in available:
+            providers.append('OpenVINOExecutionProvider')
+
+        if requested in ('auto', 'tensorrt', 'cuda') and 'CUDAExecutionProvider' in available:
+            providers.append('CUDAExecutionProvider')
+
+        providers.append('CPUExecutionProvider')
+
+        return providers
+
     def _load_model(self):
-        """Load NudeNet detector model"""
+        """Load the NudeNet ONNX model (bundled FP32 or NSFW_MODEL_PATH, e.g. INT8)"""
         try:
-            from nudenet import NudeDetector
+            import onnxruntime as ort
+            import nudenet
+            from nudenet import nudenet as nudenet_module
 
             logger.info("Loading NudeNet detector model...")
 
-            # Initialize NudeNet with default model
-            # Will download model automatically on first run
-            self.detector = NudeDetector()
+            # Bundled 320px model unless a quantized export is configured
+            model_path = os.getenv('NSFW_MODEL_PATH') or os.path.join(
+                os.path.dirname(nudenet.__file__), '320n.onnx'
+            )
+            providers = self._get_providers(ort.get_available_providers())
 
-            logger.info("NudeNet detector loaded successfully")
+            # Own session instead of NudeDetector(): it cannot take providers,
+            # which GPU builds of ONNX Runtime require
+            self.session = ort.InferenceSession(model_path, providers=providers)
+            self.input_name = self.session.get_inputs()[0].name
+
+            # Class names in model output order (module-private in NudeNet)
+            self.labels = np.array(getattr(nudenet_module, '__labels'), dtype=object)
+
+            logger.info(
+                f"NudeNet detector loaded successfully "
+                f"({os.path.basename(model_path)}, providers: {self.session.get_providers()})"
+            )
 
         except Exception as e:
             logger.error(f"Error loading NudeNet: {e}")
             logger.warning("NSFW detection will be disabled")
-            self.detector = None
+            self.session = None
+
+    def _get_censorship_level(self, label: str) -> str:
+        """Determine censorship level based on detection label"""
+        if label in CRITICAL_LABELS:
+            return 'critical'
+        elif label in HIGH_LABELS:
+            return 'high'
+        else:
+            return 'medium'
 
-    def _filter_by_confidence(
+    def _preprocess(self, frame: np.ndarray, blob: np.ndarray) -> tuple:
+        """
+        Write one BGR frame into a slot of the model's NCHW input
+
+        Equivalent to NudeNet's pad-to-square + resize + RGB + 1/255, but the
+        frame is resized first and the channel swap and scaling happen in one
+        pass over the small image, not over a full-resolution RGB copy.
+
+        Args:
+            frame: Input video frame (BGR format)
+            blob: (3, size, size) float32 slot to fill
+
+        Returns:
+            NudeNet postprocessing metadata for this frame
+        """
+        height, width = frame.shape[:2]
+        input_size = blob.shape[-1]
+
+        # Square padding goes bottom/right, so the image keeps the top-left
+        # corner and only needs scaling by the longest side
+        max_size = max(height, width)
+        scale = input_size / max_size
+        resized_width = max(1, min(input_size, round(width * scale)))
+        resized_height = max(1, min(input_size, round(height * scale)))
+
+        resized = cv2.resize(
+            frame,
+            (resized_width, resized_height),
+            interpolation=cv2.INTER_LINEAR
+        )
+
+        blob.fill(0)
+        np.multiply(
+            resized[..., ::-1].transpose(2, 0, 1),
+            1 / 255.0,
+            out=blob[:, :resized_height, :resized_width],
+            casting='unsafe'
+        )
+
+        x_pad = max_size - width
+        y_pad = max_size - height
+
+        return max_size / width, max_size / height, x_pad, y_pad, width, height
+
+    def _decode_output(
         self,
-        detections: List[Dict],
+        output: np.ndarray,
+        metadata: tuple,
         confidence_threshold: float
     ) -> List[Dict]:
-        """Filter detections by confidence threshold"""
-        return [
-            d for d in detections
-            if d.get('score', 0) >= confidence_threshold
-        ]
+        """
+        Turn one frame's raw model output into padded, clipped detections
 
-    def _normalize_bbox(self, detection: Dict, frame_shape: tuple, padding: int = 10) -> Dict:
-        """Normalize bounding box coordinates"""
-        height, width = frame_shape[:2]
+        Scoring, thresholding and box math run as whole-array numpy ops on
+        the (4 + classes, anchors) output; dicts are only built for the
+        boxes that survive NMS.
 
-        x = max(0, int(detection['box'][0]) - padding)
-        y = max(0, int(detection['box'][1]) - padding)
-        w = min(width - x, int(detection['box'][2]) + 2 * padding)
-        h = min(height - y, int(detection['box'][3]) + 2 * padding)
+        Args:
+            output: Model output for one frame, shape (4 + classes, anchors)
+            metadata: Values returned by _preprocess for this frame
+            confidence_threshold: Minimum confidence for detection (0-1)
 
-        return {
-            "x": x,
-            "y": y,
-            "width": w,
-            "height": h
-        }
+        Returns:
+            List of detection dictionaries
+        """
+        _, _, x_pad, y_pad, width, height = metadata
 
-    def _get_censorship_level(self, label: str) -> str:
-        """Determine censorship level based on detection label"""
-        # NudeNet labels: EXPOSED_ANUS, EXPOSED_ARMPITS, COVERED_BELLY, EXPOSED_BELLY,
-        # COVERED_BUTTOCKS, EXPOSED_BUTTOCKS, FACE_FEMALE, FACE_MALE, COVERED_FEET,
-        # EXPOSED_FEET, COVERED_BREAST_F, EXPOSED_BREAST_F, COVERED_GENITALIA_F,
-        # EXPOSED_GENITALIA_F, EXPOSED_BREAST_M, EXPOSED_GENITALIA_M
+        class_scores = output[4:]
+        class_ids = class_scores.argmax(axis=0)
+        scores = class_scores[class_ids, np.arange(class_ids.size)]
 
-        high_priority = [
-            'EXPOSED_GENITALIA_F',
-            'EXPOSED_GENITALIA_M',
-            'EXPOSED_BREAST_F',
-            'EXPOSED_ANUS'
-        ]
+        # Dropping low scores before NMS cannot change which higher-scoring
+        # boxes survive, so threshold first and NMS only the candidates
+        keep = np.flatnonzero(scores >= max(confidence_threshold, NUDENET_MIN_SCORE))
+        if keep.size == 0:
+            return []
 
-        medium_priority = [
-            'EXPOSED_BUTTOCKS',
-            'EXPOSED_BREAST_M'
-        ]
+        center_x, center_y, box_w, box_h = output[:4, keep]
+        scale_x = (width + x_pad) / self.input_size
+        scale_y = (height + y_pad) / self.input_size
+
+        # Center -> top-left, model input -> frame coordinates, clipped
+        x = np.clip((center_x - box_w / 2) * scale_x, 0, width)
+        y = np.clip((center_y - box_h / 2) * scale_y, 0, height)
+        w = np.minimum(box_w * scale_x, width - x)
+        h = np.minimum(box_h * scale_y, height - y)
+        scores = scores[keep]
+        class_ids = class_ids[keep]
+
+        indices = cv2.dnn.NMSBoxes(
+            np.stack([x, y, w, h], axis=1).tolist(),
+            scores.tolist(),
+            NUDENET_MIN_SCORE,
+            NUDENET_NMS_IOU
+        )
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+        if indices.size == 0:
+            return []
 
-        if label in high_priority:
-            return 'critical'
-        elif label in medium_priority:
-            return 'high'
-        else:
-            return 'medium'
+        # Pad boxes for blurring and clip them to the frame
+        boxes = np.stack([x, y, w, h], axis=1)[indices].astype(np.int64)
+        padded_x = np.maximum(0, boxes[:, 0] - self.padding)
+        padded_y = np.maximum(0, boxes[:, 1] - self.padding)
+        padded_w = np.minimum(width - padded_x, boxes[:, 2] + 2 * self.padding)
+        padded_h = np.minimum(height - padded_y, boxes[:, 3] + 2 * self.padding)
+
+        detections = []
+        for label, score, bx, by, bw, bh in zip(
+            self.labels[class_ids[indices]],
+            scores[indices].tolist(),
+            padded_x.tolist(),
+            padded_y.tolist(),
+            padded_w.tolist(),
+            padded_h.tolist()
+        ):
+            censorship_level = self._get_censorship_level(label)
+
+            detections.append({
+                "type": "nsfw",
+                "subtype": label.lower(),
+                "label": label,
+                "confidence": score,
+                "bbox": {
+                    "x": bx,
+                    "y": by,
+                    "width": bw,
+                    "height": bh
+                },
+                "should_blur": True,
+                "censorship_level": censorship_level,
+                "tracking_id": None,
+                "velocity": (0, 0)
+            })
+
+            logger.debug(
+                f"NSFW detected: {label} "
+                f"(confidence: {score:.2f}, level: {censorship_level})"
+            )
+
+        return detections
+
+    def _detect_frames(
+        self,
+        frames: List[np.ndarray],
+        confidence_threshold: float
+    ) -> List[List[Dict]]:
+        """
+        Run NudeNet on several BGR frames with one ONNX inference call
+
+        Args:
+            frames: Input video frames (BGR format)
+            confidence_threshold: Minimum confidence for detection (0-1)
+
+        Returns:
+            List of detection lists (one per frame)
+        """
+        input_size = self.input_size
+
+        inputs = np.empty((len(frames), 3, input_size, input_size), dtype=np.float32)
+        metadata = [self._preprocess(frame, inputs[i]) for i, frame in enumerate(frames)]
+
+        # One NCHW batch through the session amortizes launch overhead
+        outputs = self.session.run(
+            None,
+            {self.input_name: inputs}
+        )[0]
+
+        return [
+            self._decode_output(outputs[i], frame_metadata, confidence_threshold)
+            for i, frame_metadata in enumerate(metadata)
+        ]
 
     async def detect(
         self,
@@ -107,54 +318,18 @@ class NSFWDetector:
         Returns:
             List of detection dictionaries with bounding boxes and metadata
         """
-        if self.detector is None:
+        if self.session is None:
             return []
 
         try:
-            # Convert BGR to RGB for NudeNet
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-            # Run detection in thread pool (NudeNet is synchronous)
+            # Run detection in thread pool (ONNX Runtime is synchronous)
             loop = asyncio.get_event_loop()
-            raw_detections = await loop.run_in_executor(
-                None,
-                self.detector.detect,
-                rgb_frame
-            )
-
-            # Filter by confidence
-            filtered_detections = self._filter_by_confidence(
-                raw_detections,
+            detections = (await loop.run_in_executor(
+                _nsfw_executor,
+                self._detect_frames,
+                [frame],
                 confidence_threshold
-            )
-
-            detections = []
-            padding = int(os.getenv('BLUR_PADDING', 10))
-
-            for det in filtered_detections:
-                # Normalize bounding box
-                bbox = self._normalize_bbox(det, frame.shape, padding)
-
-                # Determine censorship level
-                censorship_level = self._get_censorship_level(det['class'])
-
-                detection = {
-                    "type": "nsfw",
-                    "subtype": det['class'].lower(),
-                    "label": det['class'],
-                    "confidence": float(det['score']),
-                    "bbox": bbox,
-                    "should_blur": True,
-                    "censorship_level": censorship_level,
-                    "tracking_id": None,
-                    "velocity": (0, 0)
-                }
-
-                detections.append(detection)
-                logger.debug(
-                    f"NSFW detected: {det['class']} "
-                    f"(confidence: {det['score']:.2f}, level: {censorship_level})"
-                )
+            ))[0]
 
             if detections:
                 logger.info(
@@ -183,51 +358,20 @@ class NSFWDetector:
         Returns:
             List of detection lists (one per frame)
         """
-        if self.detector is None:
+        if self.session is None:
             return [[] for _ in frames]
 
         try:
-            # Convert all frames to RGB
-            rgb_frames = [cv2.cvtColor(f, cv2.COLOR_BGR2RGB) for f in frames]
-
-            # Process all frames in thread pool
+            # Preprocess, infer and postprocess the whole batch off the loop
             loop = asyncio.get_event_loop()
-            tasks = [
-                loop.run_in_executor(None, self.detector.detect, frame)
-                for frame in rgb_frames
-            ]
-
-            raw_results = await asyncio.gather(*tasks)
-
-            # Process results for each frame
-            all_detections = []
-            padding = int(os.getenv('BLUR_PADDING', 10))
-
-            for frame_idx, raw_detections in enumerate(raw_results):
-                filtered = self._filter_by_confidence(raw_detections, confidence_threshold)
-
-                frame_detections = []
-                for det in filtered:
-                    bbox = self._normalize_bbox(det, frames[frame_idx].shape, padding)
-                    censorship_level = self._get_censorship_level(det['class'])
-
-                    detection = {
-                        "type": "nsfw",
-                        "subtype": det['class'].lower(),
-                        "label": det['class'],
-                        "confidence": float(det['score']),
-                        "bbox": bbox,
-                        "should_blur": True,
-                        "censorship_level": censorship_level,
-                        "tracking_id": None,
-                        "velocity": (0, 0)
-                    }
-
-                    frame_detections.append(detection)
-
-                all_detections.append(frame_detections)
-
-            logger.info(f"Batch processed {len(frames)} frames")
+            all_detections = await loop.run_in_executor(
+                _nsfw_executor,
+                self._detect_frames,
+                frames,
+                confidence_threshold
+            )
+
+            logger.debug(f"Batch processed {len(frames)} frames")
             return all_detections
 
         except Exception as e:
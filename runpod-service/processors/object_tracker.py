@@ -1,6 +1,6 @@
 """
 Object Tracking Processor
-Uses OpenCV trackers with motion prediction for persistent blur
+Uses a batched constant-velocity Kalman filter with motion prediction for persistent blur
 """
 
 import os
@@ -8,259 +8,390 @@ import logging
 import asyncio
 from typing import List, Dict, Tuple, Optional
 import numpy as np
-import cv2
-from collections import deque
 
 logger = logging.getLogger(__name__)
 
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    logger.warning("numba not installed, tracker IoU matching uses NumPy")
+
+# Constant-velocity Kalman model over [x, y, width, height, vx, vy], one
+# step per processed frame; noise levels follow SORT
+KALMAN_TRANSITION = np.eye(6, dtype=np.float32)
+KALMAN_TRANSITION[0, 4] = KALMAN_TRANSITION[1, 5] = 1
+KALMAN_PROCESS_NOISE = np.diag([1, 1, 1, 1, 0.01, 0.01]).astype(np.float32)
+KALMAN_MEASUREMENT_NOISE = np.diag([1, 1, 10, 10]).astype(np.float32)
+KALMAN_INITIAL_COVARIANCE = np.diag([10, 10, 10, 10, 10000, 10000]).astype(np.float32)
+
+
+if njit is not None:
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _iou_matrix_numba(boxes_a, boxes_b, out):
+        """Fill out[i, j] with the IoU of x1, y1, x2, y2 boxes a[i] and b[j]"""
+        for i in prange(boxes_a.shape[0]):
+            ax1, ay1, ax2, ay2 = boxes_a[i, 0], boxes_a[i, 1], boxes_a[i, 2], boxes_a[i, 3]
+            area_a = (ax2 - ax1) * (ay2 - ay1)
+
+            for j in range(boxes_b.shape[0]):
+                w = min(ax2, boxes_b[j, 2]) - max(ax1, boxes_b[j, 0])
+                h = min(ay2, boxes_b[j, 3]) - max(ay1, boxes_b[j, 1])
+
+                # Most pairs don't overlap at all: skip the area and division
+                if w <= 0.0 or h <= 0.0:
+                    out[i, j] = 0.0
+                    continue
+
+                intersection = w * h
+                area_b = (boxes_b[j, 2] - boxes_b[j, 0]) * (boxes_b[j, 3] - boxes_b[j, 1])
+                union = area_a + area_b - intersection
+                out[i, j] = intersection / union
+
+
+class TrackerPool:
+    """
+    Tracked objects of one session, stored structure-of-arrays
+
+    Row i of every array describes the same tracked object; rows [0, count)
+    are live. Kalman states, covariances and ages live in contiguous NumPy
+    arrays so prediction and matching run over all trackers at once.
+    Detection metadata (type, confidence, ...) stays in a plain list
+    alongside.
+    """
+
+    def __init__(self, capacity: int = 16):
+        self.count = 0
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.states = np.empty((capacity, 6), dtype=np.float32)  # x, y, width, height, vx, vy
+        self.covariances = np.empty((capacity, 6, 6), dtype=np.float32)
+        self.ages = np.empty(capacity, dtype=np.int32)  # Frames since last matched detection
+        self.detections: List[Dict] = []
+
+        # Running totals for O(1) stats
+        self.age_sum = 0
+        self.velocity_sum = np.zeros(2, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _grow(self):
+        """Double the capacity of every array"""
+        capacity = max(16, 2 * len(self.ids))
+
+        for name in ('ids', 'states', 'covariances', 'ages'):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def add(self, tracking_id: int, detection: Dict) -> int:
+        """
+        Append a tracked object, at rest at the detected box
 
-class TrackedObject:
-    """Represents a tracked object with history"""
-
-    def __init__(self, detection: Dict, tracker, tracking_id: int):
-        self.detection = detection
-        self.tracker = tracker
-        self.tracking_id = tracking_id
-        self.age = 0
-        self.max_age = int(os.getenv('TRACKER_MAX_AGE', 30))
-
-        # History for velocity calculation
-        self.position_history = deque(maxlen=5)
-        self.position_history.append(self._get_center())
-
-        # Velocity
-        self.velocity = (0.0, 0.0)
-
-    def _get_center(self) -> Tuple[float, float]:
-        """Get center point of bounding box"""
-        bbox = self.detection['bbox']
-        cx = bbox['x'] + bbox['width'] / 2
-        cy = bbox['y'] + bbox['height'] / 2
-        return (cx, cy)
-
-    def update_position(self, bbox: Dict):
-        """Update position and calculate velocity"""
-        self.detection['bbox'] = bbox
-        center = self._get_center()
-        self.position_history.append(center)
-
-        # Calculate velocity from history
-        if len(self.position_history) >= 2:
-            old_center = self.position_history[0]
-            frames = len(self.position_history) - 1
-
-            vx = (center[0] - old_center[0]) / frames
-            vy = (center[1] - old_center[1]) / frames
-
-            self.velocity = (vx, vy)
-            self.detection['velocity'] = self.velocity
-
-        self.age = 0  # Reset age on successful update
-
-    def predict_position(self, frames_ahead: int = 3) -> Dict:
-        """Predict future position based on velocity"""
-        vx, vy = self.velocity
-        bbox = self.detection['bbox'].copy()
-
-        bbox['x'] = int(bbox['x'] + vx * frames_ahead)
-        bbox['y'] = int(bbox['y'] + vy * frames_ahead)
-
-        return bbox
-
-    def increment_age(self):
-        """Increment age (frames since last update)"""
-        self.age += 1
+        Args:
+            tracking_id: Unique ID of the object
+            detection: Detection that started the track (kept as metadata
+                until a later match replaces it)
 
-    def is_expired(self) -> bool:
-        """Check if tracker has expired"""
-        return self.age > self.max_age
+        Returns:
+            Row index of the new object
+        """
+        if self.count == len(self.ids):
+            self._grow()
+
+        i = self.count
+        bbox = detection['bbox']
+
+        self.ids[i] = tracking_id
+        self.states[i] = (bbox['x'], bbox['y'], bbox['width'], bbox['height'], 0, 0)
+        self.covariances[i] = KALMAN_INITIAL_COVARIANCE
+        self.ages[i] = 0
+
+        self.detections.append(detection)
+        self.count += 1
+
+        return i
+
+    def predict(self):
+        """Advance every tracker one frame along its velocity"""
+        n = self.count
+        self.states[:n] = self.states[:n] @ KALMAN_TRANSITION.T
+        self.covariances[:n] = (
+            KALMAN_TRANSITION @ self.covariances[:n] @ KALMAN_TRANSITION.T
+            + KALMAN_PROCESS_NOISE
+        )
+        self.ages[:n] += 1
+        self.age_sum += n
+
+    def correct(self, i: int, bbox: Tuple[int, int, int, int]):
+        """Kalman update of row i with a measured (x, y, width, height) box"""
+        state = self.states[i]
+        covariance = self.covariances[i]
+
+        # Measurement is the first four state components, so H P H' and
+        # P H' are slices of P
+        old_velocity = state[4:].astype(np.float64)
+        innovation = np.asarray(bbox, dtype=np.float32) - state[:4]
+        residual_covariance = covariance[:4, :4] + KALMAN_MEASUREMENT_NOISE
+        gain = np.linalg.solve(residual_covariance, covariance[:4, :]).T
+
+        state += gain @ innovation
+        covariance -= gain @ covariance[:4, :]
+
+        self.velocity_sum += state[4:] - old_velocity
+        self.age_sum -= int(self.ages[i])
+        self.ages[i] = 0
+
+    def remove(self, mask: np.ndarray):
+        """Drop the rows where mask is True, keeping the rest in order"""
+        keep = ~mask
+        count = int(keep.sum())
+
+        for name in ('ids', 'states', 'covariances', 'ages'):
+            array = getattr(self, name)
+            array[:count] = array[:self.count][keep]
+
+        self.detections = [d for d, k in zip(self.detections, keep.tolist()) if k]
+        self.count = count
+
+        # Recount exactly from the survivors (also drops float drift)
+        self.age_sum = int(self.ages[:count].sum())
+        self.velocity_sum = self.states[:count, 4:].sum(axis=0, dtype=np.float64)
+
+    def clear(self):
+        """Drop all tracked objects"""
+        self.count = 0
+        self.detections = []
+        self.age_sum = 0
+        self.velocity_sum = np.zeros(2, dtype=np.float64)
 
 
 class ObjectTracker:
     """Manages object tracking across video frames"""
 
     def __init__(self):
-        self.tracker_type = os.getenv('TRACKER_TYPE', 'CSRT')
         self.prediction_frames = int(os.getenv('PREDICTION_FRAMES', 3))
+        self.max_age = int(os.getenv('TRACKER_MAX_AGE', 30))
         self.next_tracking_id = 0
-        logger.info(f"ObjectTracker initialized (type: {self.tracker_type})")
-
-    def _create_tracker(self):
-        """Create OpenCV tracker based on configured type"""
-        if self.tracker_type == 'CSRT':
-            return cv2.TrackerCSRT_create()
-        elif self.tracker_type == 'KCF':
-            return cv2.TrackerKCF_create()
-        elif self.tracker_type == 'MOSSE':
-            return cv2.legacy.TrackerMOSSE_create()
-        else:
-            logger.warning(f"Unknown tracker type: {self.tracker_type}, using CSRT")
-            return cv2.TrackerCSRT_create()
+
+        # Reused across frames by the numba IoU kernel
+        self._iou_buf = np.empty((0, 0), dtype=np.float32)
+
+        logger.info(f"ObjectTracker initialized (Kalman, max age: {self.max_age})")
 
     def _bbox_to_tuple(self, bbox: Dict) -> Tuple[int, int, int, int]:
-        """Convert bbox dict to tuple for OpenCV"""
+        """Convert bbox dict to an (x, y, width, height) tuple"""
         return (bbox['x'], bbox['y'], bbox['width'], bbox['height'])
 
-    def _tuple_to_bbox(self, bbox_tuple: Tuple[int, int, int, int]) -> Dict:
-        """Convert tuple to bbox dict"""
-        return {
-            'x': int(bbox_tuple[0]),
-            'y': int(bbox_tuple[1]),
-            'width': int(bbox_tuple[2]),
-            'height': int(bbox_tuple[3])
-        }
+    def _stack_bboxes(self, bboxes: np.ndarray) -> np.ndarray:
+        """Convert an (N, 4) array of x, y, width, height to float32 x1, y1, x2, y2"""
+        boxes = bboxes.astype(np.float32)
+        boxes[:, 2:] += boxes[:, :2]
+        return boxes
+
+    def _iou_matrix(self, boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+        """
+        Calculate pairwise Intersection over Union (IoU) between two box sets
+
+        Args:
+            boxes_a: (N, 4) array of x1, y1, x2, y2
+            boxes_b: (M, 4) array of x1, y1, x2, y2
+
+        Returns:
+            (N, M) IoU matrix (a view of a reused buffer under numba)
+        """
+        if njit is not None:
+            n, m = len(boxes_a), len(boxes_b)
+            if self._iou_buf.shape[0] < n or self._iou_buf.shape[1] < m:
+                self._iou_buf = np.empty(
+                    (max(n, self._iou_buf.shape[0]), max(m, self._iou_buf.shape[1])),
+                    dtype=np.float32
+                )
+
+            out = self._iou_buf[:n, :m]
+            _iou_matrix_numba(boxes_a, boxes_b, out)
+            return out
+
+        x_min = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+        y_min = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+        x_max = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+        y_max = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+
+        intersection = (x_max - x_min).clip(0) * (y_max - y_min).clip(0)
+
+        area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+        area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+        union = area_a[:, None] + area_b[None, :] - intersection
+
+        # Most pairs don't overlap at all: only divide for the ones that do
+        return np.divide(
+            intersection,
+            union,
+            out=np.zeros_like(intersection),
+            where=intersection > 0
+        )
+
+    def _match_detections_to_trackers(
+        self,
+        detections: List[Dict],
+        trackers: TrackerPool,
+        iou_threshold: float = 0.3
+    ) -> List[Optional[int]]:
+        """
+        Match detections to existing trackers one-to-one, greedily by IoU
 
-    def _calculate_iou(self, bbox1: Dict, bbox2: Dict) -> float:
-        """Calculate Intersection over Union (IoU) between two bounding boxes"""
-        x1_min = bbox1['x']
-        y1_min = bbox1['y']
-        x1_max = x1_min + bbox1['width']
-        y1_max = y1_min + bbox1['height']
+        Pairs are taken in descending IoU order, so each tracker is claimed
+        by at most one detection per frame: the one overlapping it most.
+        Other detections stay unmatched and start their own trackers.
 
-        x2_min = bbox2['x']
-        y2_min = bbox2['y']
-        x2_max = x2_min + bbox2['width']
-        y2_max = y2_min + bbox2['height']
+        Args:
+            detections: New detections
+            trackers: Tracked objects of the session
+            iou_threshold: Minimum IoU (exclusive) for a match
 
-        # Calculate intersection
-        x_min = max(x1_min, x2_min)
-        y_min = max(y1_min, y2_min)
-        x_max = min(x1_max, x2_max)
-        y_max = min(y1_max, y2_max)
+        Returns:
+            Matched tracker row index (or None) per detection
+        """
+        matches: List[Optional[int]] = [None] * len(detections)
 
-        if x_max < x_min or y_max < y_min:
-            return 0.0
+        if not detections or not len(trackers):
+            return matches
 
-        intersection = (x_max - x_min) * (y_max - y_min)
+        detection_boxes = np.array(
+            [self._bbox_to_tuple(d['bbox']) for d in detections],
+            dtype=np.int32
+        )
+        iou = self._iou_matrix(
+            self._stack_bboxes(detection_boxes),
+            self._stack_bboxes(trackers.states[:len(trackers), :4])
+        )
 
-        # Calculate union
-        area1 = bbox1['width'] * bbox1['height']
-        area2 = bbox2['width'] * bbox2['height']
-        union = area1 + area2 - intersection
+        # Candidate pairs above the threshold, best overlap first
+        rows, cols = np.nonzero(iou > iou_threshold)
+        order = np.argsort(-iou[rows, cols], kind='stable')
 
-        return intersection / union if union > 0 else 0.0
+        claimed = set()
+        for i, j in zip(rows[order].tolist(), cols[order].tolist()):
+            if matches[i] is None and j not in claimed:
+                matches[i] = j
+                claimed.add(j)
 
-    def _match_detection_to_tracker(
-        self,
-        detection: Dict,
-        trackers: Dict[int, TrackedObject],
-        iou_threshold: float = 0.3
-    ) -> Optional[int]:
-        """Match detection to existing tracker using IoU"""
-        best_match_id = None
-        best_iou = iou_threshold
+        return matches
 
-        for tracking_id, tracked_obj in trackers.items():
-            iou = self._calculate_iou(detection['bbox'], tracked_obj.detection['bbox'])
+    def _predict_positions(self, trackers: TrackerPool) -> Tuple[List[List[int]], List[List[float]]]:
+        """
+        Predict future positions of all trackers based on velocity
 
-            if iou > best_iou:
-                best_iou = iou
-                best_match_id = tracking_id
+        Returns:
+            (x, y, width, height) per tracker, (vx, vy) per tracker
+        """
+        states = trackers.states[:len(trackers)]
+        predicted = states[:, :4].copy()
+        predicted[:, :2] += states[:, 4:] * self.prediction_frames
 
-        return best_match_id
+        return predicted.astype(np.int64).tolist(), states[:, 4:].tolist()
 
     async def update_trackers(
         self,
         frame: np.ndarray,
         detections: List[Dict],
-        trackers: Dict[int, TrackedObject]
+        trackers: TrackerPool
     ) -> List[Dict]:
         """
         Update existing trackers and create new ones for detections
 
         Args:
-            frame: Current video frame
+            frame: Current video frame (unused; boxes are predicted from motion alone)
             detections: List of new detections from ML models
-            trackers: Dictionary of existing tracked objects
+            trackers: Tracked objects of the session
 
         Returns:
             Updated list of detections with tracking IDs and predictions
         """
         try:
-            # Update existing trackers
-            expired_ids = []
+            # Advance every tracker along its velocity
+            trackers.predict()
 
-            for tracking_id, tracked_obj in list(trackers.items()):
-                success, bbox_tuple = tracked_obj.tracker.update(frame)
-
-                if success:
-                    # Update position
-                    bbox = self._tuple_to_bbox(bbox_tuple)
-                    tracked_obj.update_position(bbox)
-                else:
-                    # Tracker failed, increment age
-                    tracked_obj.increment_age()
-
-                # Check if expired
-                if tracked_obj.is_expired():
-                    expired_ids.append(tracking_id)
-
-            # Remove expired trackers
-            for tracking_id in expired_ids:
-                del trackers[tracking_id]
-                logger.debug(f"Removed expired tracker: {tracking_id}")
+            # Remove trackers unmatched for too long
+            expired = trackers.ages[:len(trackers)] > self.max_age
+            if expired.any():
+                logger.debug(f"Removed expired trackers: {trackers.ids[:len(trackers)][expired].tolist()}")
+                trackers.remove(expired)
 
             # Match new detections to existing trackers
             matched_detections = []
             unmatched_detections = []
+            matched_ids = set()
 
-            for detection in detections:
-                match_id = self._match_detection_to_tracker(detection, trackers)
+            match_indices = self._match_detections_to_trackers(detections, trackers)
 
-                if match_id is not None:
-                    # Update existing tracker
-                    tracked_obj = trackers[match_id]
-                    tracked_obj.update_position(detection['bbox'])
+            matched_rows = []
 
-                    # Use predicted position
-                    predicted_bbox = tracked_obj.predict_position(self.prediction_frames)
+            for detection, i in zip(detections, match_indices):
+                if i is not None:
+                    # Correct existing tracker with the measured box
+                    trackers.correct(i, self._bbox_to_tuple(detection['bbox']))
 
-                    detection['tracking_id'] = match_id
-                    detection['bbox'] = predicted_bbox
-                    detection['velocity'] = tracked_obj.velocity
+                    # Persistent blur reuses the latest match's metadata (text, label, confidence)
+                    trackers.detections[i] = detection
+
+                    detection['tracking_id'] = int(trackers.ids[i])
                     detection['is_tracked'] = True
 
                     matched_detections.append(detection)
+                    matched_rows.append(i)
+                    matched_ids.add(detection['tracking_id'])
                 else:
                     # New detection, needs tracker
                     unmatched_detections.append(detection)
 
-            # Create trackers for unmatched detections
-            for detection in unmatched_detections:
-                tracker = self._create_tracker()
-                bbox_tuple = self._bbox_to_tuple(detection['bbox'])
+            # Persistent blur covers trackers that existed before this frame's detections
+            existing_count = len(trackers)
 
-                # Initialize tracker
-                success = tracker.init(frame, bbox_tuple)
+            # Predicted positions of all existing trackers in one pass; matching
+            # is one-to-one, so a matched row only carries its own detection's
+            # correction
+            predicted_bboxes, velocities = self._predict_positions(trackers)
 
-                if success:
-                    tracking_id = self.next_tracking_id
-                    self.next_tracking_id += 1
+            # Use predicted position
+            for detection, i in zip(matched_detections, matched_rows):
+                x, y, width, height = predicted_bboxes[i]
+                detection['bbox'] = {'x': x, 'y': y, 'width': width, 'height': height}
+                detection['velocity'] = tuple(velocities[i])
 
-                    tracked_obj = TrackedObject(detection, tracker, tracking_id)
-                    trackers[tracking_id] = tracked_obj
+            # Create trackers for unmatched detections
+            for detection in unmatched_detections:
+                tracking_id = self.next_tracking_id
+                self.next_tracking_id += 1
 
-                    detection['tracking_id'] = tracking_id
-                    detection['is_tracked'] = True
-                    detection['velocity'] = (0, 0)
+                trackers.add(tracking_id, detection)
 
-                    matched_detections.append(detection)
-                    logger.debug(f"Created new tracker: {tracking_id} for {detection['type']}")
+                detection['tracking_id'] = tracking_id
+                detection['is_tracked'] = True
+                detection['velocity'] = (0, 0)
+
+                matched_detections.append(detection)
+                logger.debug(f"Created new tracker: {tracking_id} for {detection['type']}")
 
             # Add detections from trackers without new detections (persistent blur)
-            for tracking_id, tracked_obj in trackers.items():
-                # Check if this tracker was matched
-                if not any(d.get('tracking_id') == tracking_id for d in matched_detections):
-                    # Add predicted position
-                    predicted_bbox = tracked_obj.predict_position(self.prediction_frames)
+            for i in range(existing_count):
+                tracking_id = int(trackers.ids[i])
+
+                # Skip trackers matched by a new detection
+                if tracking_id in matched_ids:
+                    continue
 
-                    persistent_detection = tracked_obj.detection.copy()
-                    persistent_detection['bbox'] = predicted_bbox
-                    persistent_detection['tracking_id'] = tracking_id
-                    persistent_detection['is_tracked'] = True
-                    persistent_detection['is_persistent'] = True  # No new detection, just tracking
+                # Add predicted position
+                x, y, width, height = predicted_bboxes[i]
+                persistent_detection = trackers.detections[i].copy()
+                persistent_detection['bbox'] = {'x': x, 'y': y, 'width': width, 'height': height}
+                persistent_detection['velocity'] = tuple(velocities[i])
+                persistent_detection['tracking_id'] = tracking_id
+                persistent_detection['is_tracked'] = True
+                persistent_detection['is_persistent'] = True  # No new detection, just tracking
 
-                    matched_detections.append(persistent_detection)
+                matched_detections.append(persistent_detection)
 
             logger.debug(
                 f"Tracking update: {len(matched_detections)} detections, "
@@ -273,33 +404,30 @@ class ObjectTracker:
             logger.error(f"Error in tracker update: {e}")
             return detections  # Return original detections on error
 
-    def clear_trackers(self, trackers: Dict[int, TrackedObject]):
+    def clear_trackers(self, trackers: TrackerPool):
         """Clear all trackers"""
         trackers.clear()
         logger.info("All trackers cleared")
 
-    def get_tracker_count(self, trackers: Dict[int, TrackedObject]) -> int:
+    def get_tracker_count(self, trackers: TrackerPool) -> int:
         """Get count of active trackers"""
         return len(trackers)
 
-    def get_tracker_stats(self, trackers: Dict[int, TrackedObject]) -> Dict:
-        """Get statistics about active trackers"""
-        if not trackers:
+    def get_tracker_stats(self, trackers: TrackerPool) -> Dict:
+        """Get statistics about active trackers (averages from running totals)"""
+        if not len(trackers):
             return {
                 "active_count": 0,
                 "average_age": 0,
                 "average_velocity": (0, 0)
             }
 
-        ages = [t.age for t in trackers.values()]
-        velocities = [t.velocity for t in trackers.values()]
-
-        avg_vx = sum(v[0] for v in velocities) / len(velocities)
-        avg_vy = sum(v[1] for v in velocities) / len(velocities)
+        count = len(trackers)
+        avg_vx, avg_vy = (trackers.velocity_sum / count).tolist()
 
         return {
-            "active_count": len(trackers),
-            "average_age": sum(ages) / len(ages),
+            "active_count": count,
+            "average_age": trackers.age_sum / count,
             "average_velocity": (avg_vx, avg_vy),
-            "types": [t.detection['type'] for t in trackers.values()]
+            "types": [d['type'] for d in trackers.detections]
         }
@@ -4,14 +4,87 @@ Uses Keras-OCR for text detection and profanity matching for filtering
 """
 
 import os
+import re
 import logging
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import List, Dict, Tuple
 import numpy as np
-import cv2
 
 logger = logging.getLogger(__name__)
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+    logger.warning("pyahocorasick not installed, OCR profanity matching uses a compiled regex")
+
+# Dedicated OCR thread: Keras-OCR is GPU-bound, so more threads only contend
+# for the GPU, and OCR no longer competes with JPEG work in the default pool
+_ocr_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('OCR_EXECUTOR_WORKERS', 1)),
+    thread_name_prefix='ocr'
+)
+
+
+# ASCII normalization table: letters lowercased, everything but [a-z0-9] deleted
+_ASCII_NORMALIZE_TABLE = {
+    i: (chr(i).lower() if chr(i).isalnum() else None) for i in range(128)
+}
+
+
+def _normalize_text(text: str) -> str:
+    """Normalize text for comparison"""
+    # Remove special characters, convert to lowercase, remove spaces; OCR
+    # output is almost always ASCII, which one C-level translate handles
+    if text.isascii():
+        return text.translate(_ASCII_NORMALIZE_TABLE)
+    return ''.join(c.lower() for c in text if c.isalnum())
+
+
+@lru_cache(maxsize=32)
+def _normalize_profanity_list(words: tuple) -> tuple:
+    """Normalize (once per distinct list) profane words, as (normalized, word) pairs"""
+    pairs = []
+    seen = set()
+
+    for word in words:
+        normalized = _normalize_text(word)
+        if normalized and normalized not in seen:
+            seen.add(normalized)
+            pairs.append((normalized, word))
+
+    return tuple(pairs)
+
+
+@lru_cache(maxsize=32)
+def _build_profanity_automaton(words: tuple):
+    """Build (once per distinct list) an Aho-Corasick automaton over normalized words"""
+    automaton = ahocorasick.Automaton()
+
+    # Value is the word's position in the list, so the earliest listed word wins
+    for index, (normalized, word) in enumerate(_normalize_profanity_list(words)):
+        automaton.add_word(normalized, (index, word))
+
+    automaton.make_automaton()
+    return automaton
+
+
+@lru_cache(maxsize=32)
+def _build_profanity_regex(words: tuple):
+    """
+    Build (once per distinct list) a regex matching any normalized word
+
+    The lookahead reports a match at every position, overlapping ones
+    included, and alternation order makes each position report its
+    earliest listed word; returns (pattern, normalized word -> list index).
+    """
+    pairs = _normalize_profanity_list(words)
+    pattern = re.compile('(?=(' + '|'.join(re.escape(normalized) for normalized, _ in pairs) + '))')
+    index = {normalized: i for i, (normalized, _) in enumerate(pairs)}
+    return pattern, index
+
 
 class TextDetector:
     """Detects text in video frames and filters profanity"""
@@ -27,10 +100,16 @@ class TextDetector:
         try:
             import keras_ocr
 
+            # CRAFT is fully convolutional, so OCR cost follows the size the
+            # pipeline resizes frames to (once, on CPU): scale x the input,
+            # capped at max_size on the longest side
+            scale = float(os.getenv('OCR_SCALE', 2))
+            max_size = int(os.getenv('OCR_MAX_SIZE', 2048))
+
             # Initialize Keras-OCR pipeline with GPU support
             logger.info("Loading Keras-OCR pipeline (this may take a minute)...")
-            self.pipeline = keras_ocr.pipeline.Pipeline()
-            logger.info("Keras-OCR pipeline loaded successfully")
+            self.pipeline = keras_ocr.pipeline.Pipeline(scale=scale, max_size=max_size)
+            logger.info(f"Keras-OCR pipeline loaded successfully (scale: {scale}, max size: {max_size})")
 
         except Exception as e:
             logger.error(f"Error loading Keras-OCR: {e}")
@@ -39,57 +118,93 @@ class TextDetector:
 
     def _normalize_text(self, text: str) -> str:
         """Normalize text for comparison"""
-        # Remove special characters, convert to lowercase, remove spaces
-        normalized = ''.join(c.lower() for c in text if c.isalnum())
-        return normalized
+        return _normalize_text(text)
 
     def _is_profanity(self, text: str, profanity_list: List[str]) -> Tuple[bool, str]:
-        """Check if text contains profanity"""
-        normalized_text = self._normalize_text(text)
+        """Check if text contains profanity (first listed match wins)"""
+        if not profanity_list:
+            return False, ""
+
+        words = tuple(profanity_list)
+        normalized_words = _normalize_profanity_list(words)
+        if not normalized_words:
+            return False, ""
+
+        normalized_text = _normalize_text(text)
+
+        # One pass over the text finds every listed word it contains
+        if ahocorasick is None:
+            pattern, index = _build_profanity_regex(words)
+            matches = [index[m.group(1)] for m in pattern.finditer(normalized_text)]
+            if matches:
+                return True, normalized_words[min(matches)][1]
+            return False, ""
 
-        # Check against profanity list
-        for profane_word in profanity_list:
-            normalized_profane = self._normalize_text(profane_word)
-            if normalized_profane in normalized_text:
-                return True, profane_word
+        matches = [value for _, value in _build_profanity_automaton(words).iter(normalized_text)]
+        if matches:
+            return True, min(matches)[1]
 
         return False, ""
 
-    def _calculate_bounding_box(self, box: np.ndarray, padding: int = 10) -> Dict:
-        """Calculate bounding box from Keras-OCR box coordinates"""
-        # Keras-OCR returns box as [[x1,y1], [x2,y2], [x3,y3], [x4,y4]]
-        x_coords = box[:, 0]
-        y_coords = box[:, 1]
-
-        x_min = int(np.min(x_coords)) - padding
-        y_min = int(np.min(y_coords)) - padding
-        x_max = int(np.max(x_coords)) + padding
-        y_max = int(np.max(y_coords)) + padding
-
-        return {
-            "x": max(0, x_min),
-            "y": max(0, y_min),
-            "width": x_max - x_min,
-            "height": y_max - y_min
-        }
-
-    def _predict_position(
+    def _calculate_bounding_boxes(self, boxes: np.ndarray, padding: int = 10) -> np.ndarray:
+        """
+        Calculate padded bounding boxes from Keras-OCR box coordinates
+
+        Args:
+            boxes: (K, 4, 2) array of box corners (Keras-OCR returns each box
+                as [[x1,y1], [x2,y2], [x3,y3], [x4,y4]])
+            padding: Extra pixels around each box
+
+        Returns:
+            (K, 4) int32 array of x, y, width, height
+        """
+        mins = boxes.min(axis=1).astype(np.int32) - padding
+        maxs = boxes.max(axis=1).astype(np.int32) + padding
+
+        # Size is measured from the unclamped corner
+        return np.concatenate([np.maximum(mins, 0), maxs - mins], axis=1)
+
+    def _build_detections(
         self,
-        current_box: Dict,
-        velocity: Tuple[float, float],
-        frames_ahead: int = 3
-    ) -> Dict:
-        """Predict future position based on velocity"""
-        vx, vy = velocity
-
-        predicted_box = {
-            "x": int(current_box["x"] + vx * frames_ahead),
-            "y": int(current_box["y"] + vy * frames_ahead),
-            "width": current_box["width"],
-            "height": current_box["height"]
-        }
-
-        return predicted_box
+        frame_predictions: List[Tuple[str, np.ndarray]],
+        profanity_list: List[str],
+        padding: int
+    ) -> List[Dict]:
+        """Turn one frame's OCR results into detections for the profane texts"""
+        matches = []
+        for text, box in frame_predictions:
+            # Check if text contains profanity
+            is_profane, matched_word = self._is_profanity(text, profanity_list)
+            if is_profane:
+                matches.append((text, box, matched_word))
+
+        if not matches:
+            return []
+
+        # Bounding boxes of all profane texts in one reduction
+        bboxes = self._calculate_bounding_boxes(
+            np.stack([box for _, box, _ in matches]),
+            padding
+        ).tolist()
+
+        detections = []
+        for (text, _, matched_word), (x, y, width, height) in zip(matches, bboxes):
+            detection = {
+                "type": "text",
+                "subtype": "profanity",
+                "text": text,
+                "matched_word": matched_word,
+                "confidence": 1.0,  # Keras-OCR doesn't provide confidence
+                "bbox": {"x": x, "y": y, "width": width, "height": height},
+                "should_blur": True,
+                "tracking_id": None,  # Will be assigned by tracker
+                "velocity": (0, 0)  # Will be updated by tracker
+            }
+
+            detections.append(detection)
+            logger.debug(f"Profanity detected: '{text}' (matched: {matched_word})")
+
+        return detections
 
     async def detect(
         self,
@@ -108,61 +223,61 @@ class TextDetector:
         Returns:
             List of detection dictionaries with bounding boxes and metadata
         """
-        if self.pipeline is None:
-            return []
+        return (await self.detect_batch([frame], confidence_threshold, profanity_list))[0]
+
+    async def detect_batch(
+        self,
+        frames: List[np.ndarray],
+        confidence_threshold: float = 0.7,
+        profanity_list: List[str] = None
+    ) -> List[List[Dict]]:
+        """
+        Detect text in multiple frames with one Keras-OCR call and filter for profanity
+
+        Args:
+            frames: Input video frames (BGR format)
+            confidence_threshold: Minimum confidence for detection
+            profanity_list: List of profane words to detect
+
+        Returns:
+            List of detection lists (one per frame)
+        """
+        if self.pipeline is None or not frames:
+            return [[] for _ in frames]
 
         if profanity_list is None:
             profanity_list = []
 
         try:
-            # Convert BGR to RGB for Keras-OCR
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            # RGB views for Keras-OCR, no copy: its own rescale/float conversion
+            # materializes the pixels anyway, so the channel swap rides along
+            rgb_frames = [frame[..., ::-1] for frame in frames]
 
-            # Run OCR in thread pool (Keras-OCR is synchronous)
+            # Run OCR on the OCR thread (Keras-OCR is synchronous); the detector
+            # and recognizer CNNs run on the whole batch at once
             loop = asyncio.get_event_loop()
             predictions = await loop.run_in_executor(
-                None,
+                _ocr_executor,
                 self.pipeline.recognize,
-                [rgb_frame]
+                rgb_frames
             )
 
-            # predictions is a list of lists: [[(text, box), ...]]
-            frame_predictions = predictions[0] if predictions else []
-
-            detections = []
+            # predictions is a list of lists: [[(text, box), ...], ...]
             padding = int(os.getenv('BLUR_PADDING', 10))
+            all_detections = [
+                self._build_detections(frame_predictions, profanity_list, padding)
+                for frame_predictions in predictions
+            ]
 
-            for text, box in frame_predictions:
-                # Check if text contains profanity
-                is_profane, matched_word = self._is_profanity(text, profanity_list)
-
-                if is_profane:
-                    # Calculate bounding box
-                    bbox = self._calculate_bounding_box(box, padding)
+            found = sum(len(detections) for detections in all_detections)
+            if found:
+                logger.info(f"Text detector found {found} profane text(s) in {len(frames)} frame(s)")
 
-                    detection = {
-                        "type": "text",
-                        "subtype": "profanity",
-                        "text": text,
-                        "matched_word": matched_word,
-                        "confidence": 1.0,  # Keras-OCR doesn't provide confidence
-                        "bbox": bbox,
-                        "should_blur": True,
-                        "tracking_id": None,  # Will be assigned by tracker
-                        "velocity": (0, 0)  # Will be updated by tracker
-                    }
-
-                    detections.append(detection)
-                    logger.debug(f"Profanity detected: '{text}' (matched: {matched_word})")
-
-            if detections:
-                logger.info(f"Text detector found {len(detections)} profane text(s)")
-
-            return detections
+            return all_detections
 
         except Exception as e:
             logger.error(f"Error in text detection: {e}")
-            return []
+            return [[] for _ in frames]
 
     async def detect_with_context(
         self,
@@ -190,5 +305,13 @@ class TextDetector:
 
     def preload_profanity_list(self, profanity_list: List[str]):
         """Preload profanity list into cache for faster lookups"""
-        self.profanity_cache = set(self._normalize_text(word) for word in profanity_list)
+        words = tuple(profanity_list)
+        self.profanity_cache = set(normalized for normalized, _ in _normalize_profanity_list(words))
+
+        if self.profanity_cache:
+            if ahocorasick is not None:
+                _build_profanity_automaton(words)
+            else:
+                _build_profanity_regex(words)
+
         logger.info(f"Preloaded {len(self.profanity_cache)} profane words into cache")
@@ -0,0 +1,139 @@
+"""
+Session Store
+Shares session config and frame counters across uvicorn workers via Redis
+"""
+
+import os
+import json
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore:
+    """
+    Stores small per-session state (config, frame counter) shared by workers
+
+    Heavyweight state such as trackers stays in each worker and is rebuilt
+    from the stored config when a session lands on a new worker. Without
+    Redis the store falls back to process-local dictionaries.
+    """
+
+    def __init__(self):
+        self.redis = None
+        self.ttl = int(os.getenv('SESSION_TTL_SECONDS', 3600))
+        self.key_prefix = 'session:'
+
+        # In-memory fallback
+        self._configs: Dict[str, Dict] = {}
+        self._frame_counts: Dict[str, int] = {}
+
+    async def connect(self):
+        """Connect to Redis if configured, otherwise stay in-memory"""
+        host = os.getenv('REDIS_HOST')
+
+        if not host:
+            logger.info("REDIS_HOST not set, using in-memory session store")
+            return
+
+        try:
+            import redis.asyncio as redis
+
+            client = redis.Redis(
+                host=host,
+                port=int(os.getenv('REDIS_PORT', 6379)),
+                db=int(os.getenv('REDIS_DB', 0))
+            )
+            await client.ping()
+            self.redis = client
+            logger.info(f"Session store connected to Redis at {host}")
+
+        except Exception as e:
+            logger.warning(f"Could not connect to Redis ({e}), using in-memory session store")
+            self.redis = None
+
+    async def close(self):
+        """Close the Redis connection"""
+        if self.redis is not None:
+            await self.redis.close()
+            self.redis = None
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.key_prefix}{session_id}"
+
+    async def create(self, session_id: str, config: Dict):
+        """Store a new session's config and reset its frame counter"""
+        if self.redis is None:
+            self._configs[session_id] = config
+            self._frame_counts[session_id] = 0
+            return
+
+        key = self._key(session_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={"config": json.dumps(config), "frame_count": 0})
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+    async def get_config(self, session_id: str) -> Optional[Dict]:
+        """Get a session's config, refreshing its TTL; None if not found"""
+        if self.redis is None:
+            return self._configs.get(session_id)
+
+        key = self._key(session_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hget(key, "config")
+            pipe.expire(key, self.ttl)
+            config, _ = await pipe.execute()
+
+        return json.loads(config) if config is not None else None
+
+    async def touch(self, session_id: str) -> bool:
+        """Refresh a session's TTL; returns False if it no longer exists"""
+        if self.redis is None:
+            return session_id in self._configs
+
+        # A key without config is a deleted session (or a counter leaked by
+        # an older version); the TTL still bounds its lifetime
+        key = self._key(session_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hexists(key, "config")
+            pipe.expire(key, self.ttl)
+            exists, _ = await pipe.execute()
+
+        return bool(exists)
+
+    async def incr_frame_count(self, session_id: str) -> Optional[int]:
+        """
+        Atomically advance a session's frame counter and return the new value
+
+        Returns None if the session was deleted (on any worker), without
+        leaving a counter-only key behind.
+        """
+        if self.redis is None:
+            if session_id not in self._configs:
+                return None
+            self._frame_counts[session_id] = self._frame_counts.get(session_id, 0) + 1
+            return self._frame_counts[session_id]
+
+        key = self._key(session_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hexists(key, "config")
+            pipe.hincrby(key, "frame_count", 1)
+            pipe.expire(key, self.ttl)
+            exists, frame_count, _ = await pipe.execute()
+
+        if not exists:
+            # HINCRBY re-created the deleted session's key; drop it again
+            await self.redis.delete(key)
+            return None
+
+        return frame_count
+
+    async def delete(self, session_id: str) -> bool:
+        """Delete a session; returns False if it did not exist"""
+        if self.redis is None:
+            self._frame_counts.pop(session_id, None)
+            return self._configs.pop(session_id, None) is not None
+
+        return bool(await self.redis.delete(self._key(session_id)))
@@ -0,0 +1,161 @@
+"""
+Tests for the overlapping Whisper windows of streamed audio
+
+Whisper is replaced by a fake that reads the stream position back out of the
+samples: second i of the stream is filled with the value i / 1000, and the
+fake reports one segment per second of window audio, saying "damn <i>".
+"""
+
+import asyncio
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from processors.audio_profanity import AudioProfanityDetector, WHISPER_SAMPLE_RATE
+
+try:
+    import av
+except ImportError:
+    av = None
+
+SAMPLE_RATE = WHISPER_SAMPLE_RATE
+
+
+def make_detector(window_seconds: float = 25.0, overlap_seconds: float = 5.0) -> AudioProfanityDetector:
+    """Detector with no models loaded and the VAD gate off"""
+    with mock.patch.object(AudioProfanityDetector, '_load_models'):
+        detector = AudioProfanityDetector()
+
+    detector.vad = None
+    detector.stream_window_seconds = window_seconds
+    detector.stream_overlap_seconds = overlap_seconds
+
+    async def transcribe(audio_data):
+        segments = []
+        for second in range(len(audio_data) // SAMPLE_RATE):
+            position = int(round(audio_data[second * SAMPLE_RATE] * 1000))
+            segments.append({
+                'start': float(second),
+                'end': float(second + 1),
+                'text': f' damn {position}'
+            })
+
+        return {'text': ''.join(s['text'] for s in segments), 'segments': segments}
+
+    detector._transcribe_local = transcribe
+    return detector
+
+
+def labeled_stream(seconds: int) -> np.ndarray:
+    """Mono float32 audio whose samples in second i all equal i / 1000"""
+    return np.repeat(np.arange(seconds, dtype=np.float32) / 1000, SAMPLE_RATE)
+
+
+async def chunked(audio: np.ndarray, chunk_seconds: float):
+    step = int(chunk_seconds * SAMPLE_RATE)
+    for i in range(0, len(audio), step):
+        yield audio[i:i + step]
+
+
+def run_windows(detector, audio: np.ndarray, chunk_seconds: float = 5.0) -> list:
+    async def collect():
+        return [
+            window async for window in detector._detect_windows(
+                chunked(audio, chunk_seconds),
+                SAMPLE_RATE,
+                profanity_list=['damn']
+            )
+        ]
+
+    return asyncio.run(collect())
+
+
+def reported_seconds(windows: list) -> list:
+    """Stream seconds reported across all windows, in report order"""
+    seconds = []
+
+    for window in windows:
+        for detection in window['detections']:
+            for timestamp in detection['timestamps']:
+                label = int(timestamp['text'].split()[-1])
+                # Timestamps are shifted to stream time
+                assert timestamp['start'] == label
+                seconds.append(label)
+
+    return seconds
+
+
+class DetectWindowsTest(unittest.TestCase):
+
+    def test_exact_multiple_of_window_reports_tail(self):
+        for seconds in (25, 50):
+            with self.subTest(seconds=seconds):
+                windows = run_windows(make_detector(), labeled_stream(seconds))
+                self.assertEqual(reported_seconds(windows), list(range(seconds)))
+
+    def test_partial_last_window_reports_every_second_once(self):
+        for seconds in (7, 37, 61):
+            with self.subTest(seconds=seconds):
+                windows = run_windows(make_detector(), labeled_stream(seconds), chunk_seconds=3.0)
+                self.assertEqual(reported_seconds(windows), list(range(seconds)))
+
+    def test_windows_cover_stream_contiguously(self):
+        windows = run_windows(make_detector(), labeled_stream(60))
+
+        self.assertEqual(
+            [(w['start'], w['end']) for w in windows],
+            [(0.0, 25.0), (25.0, 50.0), (50.0, 60.0)]
+        )
+
+    def test_windows_without_overlap(self):
+        windows = run_windows(make_detector(overlap_seconds=0.0), labeled_stream(50))
+        self.assertEqual(reported_seconds(windows), list(range(50)))
+
+    def test_one_chunk_larger_than_several_windows(self):
+        windows = run_windows(make_detector(), labeled_stream(75), chunk_seconds=75.0)
+
+        self.assertEqual(len(windows), 3)
+        self.assertEqual(reported_seconds(windows), list(range(75)))
+
+    def test_empty_stream_yields_nothing(self):
+        self.assertEqual(run_windows(make_detector(), labeled_stream(0)), [])
+
+
+class DetectStreamTest(unittest.TestCase):
+
+    def run_stream(self, detector, pcm: bytes, chunk_bytes: int) -> list:
+        async def collect():
+            queue = asyncio.Queue()
+            for i in range(0, len(pcm), chunk_bytes):
+                await queue.put(pcm[i:i + chunk_bytes])
+            await queue.put(None)
+
+            return [window async for window in detector.detect_stream(queue)]
+
+        return asyncio.run(collect())
+
+    def test_odd_sized_chunks_keep_samples_aligned(self):
+        detector = make_detector()
+        pcm = (labeled_stream(30) * 32768).round().astype('<i2').tobytes()
+
+        windows = self.run_stream(detector, pcm, chunk_bytes=4801)
+
+        self.assertEqual([(w['start'], w['end']) for w in windows], [(0.0, 25.0), (25.0, 30.0)])
+
+    @unittest.skipIf(av is None, "PyAV not installed")
+    def test_other_sample_rates_are_resampled_to_16k(self):
+        for sample_rate in (8000, 48000):
+            with self.subTest(sample_rate=sample_rate):
+                detector = make_detector()
+                detector.stream_sample_rate = sample_rate
+                pcm = np.zeros(30 * sample_rate, dtype='<i2').tobytes()
+
+                windows = self.run_stream(detector, pcm, chunk_bytes=sample_rate)
+
+                self.assertEqual([w['start'] for w in windows], [0.0, 25.0])
+                self.assertAlmostEqual(windows[-1]['end'], 30.0, places=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
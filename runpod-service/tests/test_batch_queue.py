@@ -0,0 +1,83 @@
+"""
+Tests for cross-session NSFW request batching
+"""
+
+import asyncio
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from processors.batch_queue import BatchedInferenceQueue
+
+
+class FakeNSFWDetector:
+    """Returns one detection per confidence in `confidences` for every frame"""
+
+    def __init__(self, confidences=(0.5, 0.8, 0.95), error: Exception = None):
+        self.confidences = confidences
+        self.error = error
+        self.calls = []
+
+    async def detect_batch(self, frames, confidence_threshold):
+        self.calls.append((len(frames), confidence_threshold))
+        if self.error is not None:
+            raise self.error
+
+        return [
+            [{'type': 'nsfw', 'confidence': c} for c in self.confidences if c >= confidence_threshold]
+            for _ in frames
+        ]
+
+
+def make_queue(detector, **env) -> BatchedInferenceQueue:
+    with mock.patch.dict('os.environ', env):
+        return BatchedInferenceQueue(detector)
+
+
+async def submit_all(queue: BatchedInferenceQueue, thresholds: list) -> list:
+    queue.start()
+    try:
+        frame = np.zeros((4, 4, 3), dtype=np.uint8)
+        return await asyncio.gather(
+            *(queue.submit(frame, threshold) for threshold in thresholds),
+            return_exceptions=True
+        )
+    finally:
+        await queue.stop()
+
+
+class BatchedInferenceQueueTest(unittest.TestCase):
+
+    def test_concurrent_requests_share_one_call_at_loosest_threshold(self):
+        detector = FakeNSFWDetector()
+        queue = make_queue(detector, NSFW_BATCH_SIZE='8', NSFW_BATCH_MAX_WAIT_MS='50')
+
+        results = asyncio.run(submit_all(queue, [0.9, 0.6, 0.7]))
+
+        self.assertEqual(detector.calls, [(3, 0.6)])
+        self.assertEqual(
+            [[d['confidence'] for d in detections] for detections in results],
+            [[0.95], [0.8, 0.95], [0.8, 0.95]]
+        )
+
+    def test_batches_are_capped_at_max_batch_size(self):
+        detector = FakeNSFWDetector()
+        queue = make_queue(detector, NSFW_BATCH_SIZE='2', NSFW_BATCH_MAX_WAIT_MS='50')
+
+        results = asyncio.run(submit_all(queue, [0.5] * 5))
+
+        self.assertEqual([size for size, _ in detector.calls], [2, 2, 1])
+        self.assertTrue(all(len(detections) == 3 for detections in results))
+
+    def test_inference_error_reaches_every_request(self):
+        error = RuntimeError("CUDA out of memory")
+        queue = make_queue(FakeNSFWDetector(error=error), NSFW_BATCH_MAX_WAIT_MS='50')
+
+        results = asyncio.run(submit_all(queue, [0.5, 0.9]))
+
+        self.assertEqual(results, [error, error])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,217 @@
+"""
+Tests for box merging, union/masked blur selection and CUDA blur splitting
+"""
+
+import asyncio
+import random
+import unittest
+from unittest import mock
+
+import cv2
+import numpy as np
+
+from processors import blur_applicator
+from processors.blur_applicator import BlurApplicator, CUDA_MAX_KERNEL_SIZE
+
+
+def make_applicator() -> BlurApplicator:
+    """CPU-only applicator"""
+    with mock.patch.dict('os.environ', {'BLUR_USE_GPU': 'false'}):
+        return BlurApplicator()
+
+
+def box(x: int, y: int, width: int, height: int, **metadata) -> dict:
+    result = {
+        'type': 'text',
+        'confidence': 1.0,
+        'should_blur': True,
+        'bbox': {'x': x, 'y': y, 'width': width, 'height': height}
+    }
+    result.update(metadata)
+    return result
+
+
+def brute_force_merge(detections: list) -> set:
+    """Bounding rects of the groups of (transitively) overlapping input boxes, all pairs tested"""
+    rects = [
+        (d['bbox']['x'], d['bbox']['y'], d['bbox']['x'] + d['bbox']['width'], d['bbox']['y'] + d['bbox']['height'])
+        for d in detections
+    ]
+    groups = [{i} for i in range(len(rects))]
+
+    for i, a in enumerate(rects):
+        for j, b in enumerate(rects):
+            if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3] and groups[i] is not groups[j]:
+                merged = groups[i] | groups[j]
+                for k in merged:
+                    groups[k] = merged
+
+    return {
+        (
+            min(rects[k][0] for k in group),
+            min(rects[k][1] for k in group),
+            max(rects[k][2] for k in group),
+            max(rects[k][3] for k in group)
+        )
+        for group in map(frozenset, groups)
+    }
+
+
+def rect_set(detections: list) -> set:
+    return {
+        (d['bbox']['x'], d['bbox']['y'], d['bbox']['x'] + d['bbox']['width'], d['bbox']['y'] + d['bbox']['height'])
+        for d in detections
+    }
+
+
+class MergeOverlappingBoxesTest(unittest.TestCase):
+
+    def test_matches_brute_force(self):
+        applicator = make_applicator()
+        rng = random.Random(0)
+
+        for _ in range(100):
+            detections = [
+                box(rng.randint(0, 300), rng.randint(0, 300), rng.randint(1, 60), rng.randint(1, 60))
+                for _ in range(rng.randint(1, 25))
+            ]
+            merged = applicator._merge_overlapping_boxes(detections)
+            self.assertEqual(rect_set(merged), brute_force_merge(detections))
+
+    def test_chains_merge_transitively(self):
+        detections = [box(0, 0, 10, 10), box(8, 0, 10, 10), box(16, 0, 10, 10)]
+        merged = make_applicator()._merge_overlapping_boxes(detections)
+
+        self.assertEqual(rect_set(merged), {(0, 0, 26, 10)})
+
+    def test_disjoint_boxes_are_returned_as_is(self):
+        detections = [box(0, 0, 10, 10), box(10, 0, 10, 10)]
+        self.assertIs(make_applicator()._merge_overlapping_boxes(detections), detections)
+
+    def test_merged_box_keeps_leftmost_metadata(self):
+        detections = [box(5, 0, 10, 10, text='right'), box(0, 0, 10, 10, text='left')]
+        merged = make_applicator()._merge_overlapping_boxes(detections)
+
+        self.assertEqual([d['text'] for d in merged], ['left'])
+
+
+class ApplyBlurTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.frame = rng.integers(0, 256, size=(240, 320, 3), dtype=np.uint8)
+
+    def blur(self, applicator, detections, **kwargs):
+        return asyncio.run(applicator.apply_blur(self.frame, detections, **kwargs))
+
+    def outside(self, frame: np.ndarray, detections: list) -> np.ndarray:
+        mask = np.ones(frame.shape[:2], dtype=bool)
+        for d in detections:
+            b = d['bbox']
+            mask[max(0, b['y']):b['y'] + b['height'], max(0, b['x']):b['x'] + b['width']] = False
+        return frame[mask]
+
+    def test_clean_frame_is_returned_untouched(self):
+        applicator = make_applicator()
+
+        self.assertIs(self.blur(applicator, []), self.frame)
+        self.assertIs(self.blur(applicator, [box(0, 0, 50, 50, should_blur=False)]), self.frame)
+
+    def test_per_box_blur_only_touches_boxes(self):
+        detections = [box(10, 10, 40, 40), box(200, 100, 60, 30), box(-5, 200, 30, 60)]
+        original = self.frame.copy()
+
+        result = self.blur(make_applicator(), detections)
+
+        np.testing.assert_array_equal(self.frame, original)
+        np.testing.assert_array_equal(self.outside(result, detections), self.outside(original, detections))
+        self.assertFalse(np.array_equal(result[10:50, 10:50], original[10:50, 10:50]))
+
+    def test_dense_cluster_blurs_union_once(self):
+        applicator = make_applicator()
+        detections = [box(40 + 12 * i, 40, 10, 30) for i in range(6)]
+
+        covered = sum(d['bbox']['width'] * d['bbox']['height'] for d in detections)
+        union = applicator._dense_union([d['bbox'] for d in detections], self.frame.shape, covered)
+        self.assertEqual(union, (40, 40, 110, 70))
+
+        with mock.patch.object(applicator, '_apply_gaussian_blur', wraps=applicator._apply_gaussian_blur) as per_box:
+            result = self.blur(applicator, detections)
+
+        per_box.assert_not_called()
+        np.testing.assert_array_equal(self.outside(result, detections), self.outside(self.frame, detections))
+        for d in detections:
+            b = d['bbox']
+            region = (slice(b['y'], b['y'] + b['height']), slice(b['x'], b['x'] + b['width']))
+            self.assertFalse(np.array_equal(result[region], self.frame[region]))
+
+    def test_sparse_boxes_have_no_dense_union(self):
+        applicator = make_applicator()
+        bboxes = [box(0, 0, 10, 10)['bbox'], box(300, 220, 10, 10)['bbox']] * 3
+
+        self.assertIsNone(applicator._dense_union(bboxes, self.frame.shape, 600))
+
+    def test_covered_frame_uses_masked_blur(self):
+        applicator = make_applicator()
+        detections = [box(0, 0, 160, 240), box(160, 0, 160, 240)]
+
+        with mock.patch.object(
+            applicator,
+            '_apply_gaussian_blur_masked',
+            wraps=applicator._apply_gaussian_blur_masked
+        ) as masked:
+            result = self.blur(applicator, detections, merge_overlaps=False)
+
+        masked.assert_called_once()
+        self.assertEqual(result.shape, self.frame.shape)
+
+
+class FeatheredMaskTest(unittest.TestCase):
+
+    def test_nearby_boxes_share_a_cached_read_only_mask(self):
+        applicator = make_applicator()
+
+        mask, inverse = applicator._create_feathered_mask((120, 160, 3), [box(9, 9, 30, 30)['bbox']])
+        again, _ = applicator._create_feathered_mask((120, 160, 3), [box(10, 10, 30, 30)['bbox']])
+
+        self.assertIs(mask, again)
+        self.assertFalse(mask.flags.writeable)
+        np.testing.assert_allclose(mask + inverse, 1.0)
+        self.assertEqual(mask[24, 24], 1.0)
+        self.assertEqual(mask[100, 140], 0.0)
+
+
+class CudaBlurPassesTest(unittest.TestCase):
+
+    def test_small_kernels_run_as_one_pass(self):
+        self.assertEqual(blur_applicator._cuda_blur_passes(31, 12.5), (1, 31, 12.5))
+
+    def test_passes_match_cpu_variance(self):
+        for kernel_size, sigma in ((51, 25), (45, 22.5), (101, 50)):
+            with self.subTest(kernel_size=kernel_size):
+                passes, pass_kernel, pass_sigma = blur_applicator._cuda_blur_passes(kernel_size, sigma)
+
+                self.assertGreater(passes, 1)
+                self.assertLessEqual(pass_kernel, CUDA_MAX_KERNEL_SIZE)
+                self.assertAlmostEqual(
+                    passes * blur_applicator._kernel_variance(pass_kernel, pass_sigma),
+                    blur_applicator._kernel_variance(kernel_size, sigma),
+                    delta=0.01 * blur_applicator._kernel_variance(kernel_size, sigma)
+                )
+
+    def test_passes_blur_like_one_wide_cpu_pass(self):
+        rng = np.random.default_rng(1)
+        image = rng.integers(0, 256, size=(200, 200, 3), dtype=np.uint8)
+        passes, pass_kernel, pass_sigma = blur_applicator._cuda_blur_passes(51, 25)
+
+        reference = cv2.GaussianBlur(image, (51, 51), 25).astype(np.float32)
+        result = image
+        for _ in range(passes):
+            result = cv2.GaussianBlur(result, (pass_kernel, pass_kernel), pass_sigma)
+
+        self.assertLess(np.abs(result.astype(np.float32) - reference).mean(), 1.0)
+        self.assertAlmostEqual(result.std(), reference.std(), delta=0.05 * reference.std())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,232 @@
+"""
+Tests for the Kalman TrackerPool and detection-to-tracker matching
+"""
+
+import asyncio
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from processors import object_tracker
+from processors.object_tracker import ObjectTracker, TrackerPool
+
+
+def detection(x: int, y: int, width: int = 40, height: int = 40, **metadata) -> dict:
+    result = {'type': 'text', 'bbox': {'x': x, 'y': y, 'width': width, 'height': height}}
+    result.update(metadata)
+    return result
+
+
+def brute_force_iou(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """Reference IoU of x1, y1, x2, y2 boxes, one pair at a time"""
+    out = np.zeros((len(boxes_a), len(boxes_b)))
+
+    for i, (ax1, ay1, ax2, ay2) in enumerate(boxes_a):
+        for j, (bx1, by1, bx2, by2) in enumerate(boxes_b):
+            w = min(ax2, bx2) - max(ax1, bx1)
+            h = min(ay2, by2) - max(ay1, by1)
+            if w > 0 and h > 0:
+                union = (ax2 - ax1) * (ay2 - ay1) + (bx2 - bx1) * (by2 - by1) - w * h
+                out[i, j] = w * h / union
+
+    return out
+
+
+class TrackerPoolTest(unittest.TestCase):
+
+    def test_add_grows_past_capacity(self):
+        pool = TrackerPool(capacity=2)
+        for i in range(5):
+            self.assertEqual(pool.add(i, detection(10 * i, 0)), i)
+
+        self.assertEqual(len(pool), 5)
+        self.assertEqual(pool.ids[:5].tolist(), [0, 1, 2, 3, 4])
+        self.assertEqual(pool.states[4, :4].tolist(), [40, 0, 40, 40])
+
+    def test_predict_follows_velocity(self):
+        pool = TrackerPool()
+        pool.add(0, detection(100, 100))
+        pool.states[0, 4:] = (5, -2)
+
+        pool.predict()
+
+        self.assertEqual(pool.states[0, :2].tolist(), [105, 98])
+        self.assertEqual(pool.ages[0], 1)
+        self.assertEqual(pool.age_sum, 1)
+
+    def test_correct_learns_constant_velocity(self):
+        pool = TrackerPool()
+        pool.add(0, detection(0, 0))
+
+        for frame in range(1, 30):
+            pool.predict()
+            pool.correct(0, (4 * frame, 0, 40, 40))
+
+        np.testing.assert_allclose(pool.states[0, 4:], [4, 0], atol=0.1)
+        self.assertEqual(pool.ages[0], 0)
+        np.testing.assert_allclose(pool.velocity_sum, pool.states[0, 4:], atol=1e-3)
+
+    def test_remove_keeps_order_and_recounts(self):
+        pool = TrackerPool()
+        for i in range(4):
+            pool.add(i, detection(100 * i, 0, label=i))
+        pool.predict()
+        pool.correct(2, (200, 0, 40, 40))
+
+        pool.remove(np.array([True, False, False, True]))
+
+        self.assertEqual(pool.ids[:len(pool)].tolist(), [1, 2])
+        self.assertEqual([d['label'] for d in pool.detections], [1, 2])
+        self.assertEqual(pool.age_sum, 1)
+
+    def test_clear(self):
+        pool = TrackerPool()
+        pool.add(0, detection(0, 0))
+        pool.clear()
+
+        self.assertEqual(len(pool), 0)
+        self.assertEqual(pool.detections, [])
+        self.assertEqual(pool.age_sum, 0)
+
+
+class IouMatrixTest(unittest.TestCase):
+
+    def random_boxes(self, rng, count: int) -> np.ndarray:
+        xy = rng.integers(0, 200, size=(count, 2))
+        size = rng.integers(1, 80, size=(count, 2))
+        return np.concatenate([xy, xy + size], axis=1).astype(np.float32)
+
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(0)
+        tracker = ObjectTracker()
+
+        for n, m in ((1, 1), (7, 3), (20, 25)):
+            a, b = self.random_boxes(rng, n), self.random_boxes(rng, m)
+            np.testing.assert_allclose(tracker._iou_matrix(a, b), brute_force_iou(a, b), atol=1e-5)
+
+    def test_numpy_fallback_matches_brute_force(self):
+        rng = np.random.default_rng(1)
+        a, b = self.random_boxes(rng, 12), self.random_boxes(rng, 9)
+
+        with mock.patch.object(object_tracker, 'njit', None):
+            iou = ObjectTracker()._iou_matrix(a, b)
+
+        np.testing.assert_allclose(iou, brute_force_iou(a, b), atol=1e-5)
+
+    def test_touching_boxes_do_not_overlap(self):
+        boxes_a = np.array([[0, 0, 10, 10]], dtype=np.float32)
+        boxes_b = np.array([[10, 0, 20, 10], [0, 10, 10, 20]], dtype=np.float32)
+
+        self.assertEqual(ObjectTracker()._iou_matrix(boxes_a, boxes_b).tolist(), [[0, 0]])
+
+
+class MatchDetectionsTest(unittest.TestCase):
+
+    def pool(self, *detections) -> TrackerPool:
+        pool = TrackerPool()
+        for i, d in enumerate(detections):
+            pool.add(i, d)
+        return pool
+
+    def test_tracker_is_claimed_by_its_best_detection_only(self):
+        pool = self.pool(detection(100, 100, 200, 50))
+        detections = [detection(150, 100, 200, 50), detection(100, 100, 200, 50)]
+
+        self.assertEqual(ObjectTracker()._match_detections_to_trackers(detections, pool), [None, 0])
+
+    def test_detection_falls_back_to_next_best_tracker(self):
+        pool = self.pool(detection(0, 0, 100, 100), detection(40, 0, 100, 100))
+
+        # Both detections overlap tracker 0 most; the weaker one takes tracker 1
+        detections = [detection(20, 0, 100, 100), detection(0, 0, 100, 100)]
+
+        self.assertEqual(ObjectTracker()._match_detections_to_trackers(detections, pool), [1, 0])
+
+    def test_matches_greedy_reference(self):
+        rng = np.random.default_rng(2)
+        tracker = ObjectTracker()
+
+        for _ in range(50):
+            tracks = [detection(*rng.integers(0, 200, 2).tolist(), *rng.integers(20, 80, 2).tolist()) for _ in range(6)]
+            detections = [detection(*rng.integers(0, 200, 2).tolist(), *rng.integers(20, 80, 2).tolist()) for _ in range(6)]
+
+            boxes_a = tracker._stack_bboxes(np.array([tracker._bbox_to_tuple(d['bbox']) for d in detections]))
+            boxes_b = tracker._stack_bboxes(np.array([tracker._bbox_to_tuple(d['bbox']) for d in tracks]))
+            iou = brute_force_iou(boxes_a, boxes_b)
+
+            # Reference: repeatedly take the best remaining pair
+            expected = [None] * len(detections)
+            while iou.max() > 0.3:
+                i, j = np.unravel_index(iou.argmax(), iou.shape)
+                expected[i] = int(j)
+                iou[i, :] = 0
+                iou[:, j] = 0
+
+            matches = tracker._match_detections_to_trackers(detections, self.pool(*tracks))
+            self.assertEqual(matches, expected)
+            matched = [j for j in matches if j is not None]
+            self.assertEqual(len(matched), len(set(matched)))
+
+
+class UpdateTrackersTest(unittest.TestCase):
+
+    def update(self, tracker, pool, detections):
+        return asyncio.run(tracker.update_trackers(None, detections, pool))
+
+    def test_match_keeps_tracking_id(self):
+        tracker, pool = ObjectTracker(), TrackerPool()
+
+        first = self.update(tracker, pool, [detection(100, 100)])
+        second = self.update(tracker, pool, [detection(104, 100)])
+
+        self.assertEqual(len(second), 1)
+        self.assertEqual(second[0]['tracking_id'], first[0]['tracking_id'])
+        self.assertNotIn('is_persistent', second[0])
+
+    def test_detections_sharing_a_track_keep_their_own_boxes(self):
+        tracker, pool = ObjectTracker(), TrackerPool()
+
+        self.update(tracker, pool, [detection(100, 100, 200, 50)])
+        result = self.update(tracker, pool, [detection(100, 100, 200, 50), detection(210, 100, 200, 50)])
+
+        self.assertEqual([d['tracking_id'] for d in result], [0, 1])
+        self.assertEqual([d['bbox']['x'] for d in result], [100, 210])
+        self.assertEqual([d['bbox']['width'] for d in result], [200, 200])
+
+    def test_unmatched_detection_starts_new_track(self):
+        tracker, pool = ObjectTracker(), TrackerPool()
+
+        self.update(tracker, pool, [detection(0, 0)])
+        result = self.update(tracker, pool, [detection(500, 500)])
+
+        self.assertEqual(len(pool), 2)
+        self.assertEqual(sorted(d['tracking_id'] for d in result), [0, 1])
+        self.assertEqual([d.get('is_persistent', False) for d in result], [False, True])
+
+    def test_persistent_detection_uses_latest_match_metadata(self):
+        tracker, pool = ObjectTracker(), TrackerPool()
+
+        self.update(tracker, pool, [detection(100, 100, text='darn', confidence=0.5)])
+        self.update(tracker, pool, [detection(102, 100, text='damn', confidence=0.9)])
+        persistent = self.update(tracker, pool, [])
+
+        self.assertEqual(len(persistent), 1)
+        self.assertTrue(persistent[0]['is_persistent'])
+        self.assertEqual(persistent[0]['text'], 'damn')
+        self.assertEqual(persistent[0]['confidence'], 0.9)
+
+    def test_tracks_expire_after_max_age(self):
+        tracker, pool = ObjectTracker(), TrackerPool()
+        tracker.max_age = 2
+
+        self.update(tracker, pool, [detection(0, 0)])
+        for _ in range(2):
+            self.assertEqual(len(self.update(tracker, pool, [])), 1)
+
+        self.assertEqual(self.update(tracker, pool, []), [])
+        self.assertEqual(len(pool), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+"""
+Tests for the audio (transcript) and OCR text profanity matchers
+
+Each matcher has a pyahocorasick path and a fallback; both are checked
+against a plain reference implementation and against each other.
+"""
+
+import random
+import unittest
+from unittest import mock
+
+from processors import audio_profanity, text_detector
+from processors.audio_profanity import AudioProfanityDetector
+from processors.text_detector import TextDetector
+
+try:
+    from better_profanity import profanity
+except ImportError:
+    profanity = None
+
+WORDS = ['damn', 'Damn', 'hell', 'HELL', 'ass', 'bastard', 'crap', '', 'sh!t', 'a b']
+
+
+def random_text(rng: random.Random) -> str:
+    pieces = WORDS + ['the', 'classic', 'shell', 'hello', 'A B', 'what', '!', ' ', 'DAMN']
+    return ' '.join(rng.choice(pieces) for _ in range(rng.randint(0, 8)))
+
+
+def audio_detector() -> AudioProfanityDetector:
+    with mock.patch.object(AudioProfanityDetector, '_load_models'):
+        return AudioProfanityDetector()
+
+
+def text_detector_instance() -> TextDetector:
+    with mock.patch.object(TextDetector, '_load_model'):
+        return TextDetector()
+
+
+class AudioCustomWordsTest(unittest.TestCase):
+
+    def reference(self, text: str, words: list) -> list:
+        """List order, once per lowercased word, earliest spelling wins"""
+        matched, seen = [], set()
+        for word in words:
+            lowered = word.lower()
+            if lowered and lowered not in seen:
+                seen.add(lowered)
+                if lowered in text.lower():
+                    matched.append(word)
+        return matched
+
+    def match(self, text: str, words: list, use_automaton: bool) -> list:
+        detector = audio_detector()
+        if use_automaton:
+            return detector._match_custom_words(text.lower(), words)
+
+        with mock.patch.object(audio_profanity, 'ahocorasick', None):
+            return detector._match_custom_words(text.lower(), words)
+
+    def test_fallback_matches_reference(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            words = rng.sample(WORDS, rng.randint(1, len(WORDS)))
+            text = random_text(rng)
+            self.assertEqual(self.match(text, words, False), self.reference(text, words))
+
+    @unittest.skipIf(audio_profanity.ahocorasick is None, "pyahocorasick not installed")
+    def test_automaton_matches_reference(self):
+        rng = random.Random(1)
+        for _ in range(200):
+            words = rng.sample(WORDS, rng.randint(1, len(WORDS)))
+            text = random_text(rng)
+            self.assertEqual(self.match(text, words, True), self.reference(text, words))
+
+    def test_case_variants_report_earliest_spelling_once(self):
+        for use_automaton in (False, audio_profanity.ahocorasick is not None):
+            with self.subTest(use_automaton=use_automaton):
+                self.assertEqual(
+                    self.match('Damn, damn, DAMN', ['Damn', 'damn', 'DAMN'], use_automaton),
+                    ['Damn']
+                )
+
+    def test_detections_carry_matched_word(self):
+        detections = audio_detector()._detect_profanity_in_text('oh hell no', ['crap', 'HELL'])
+
+        self.assertEqual([d['matched_word'] for d in detections], ['HELL'])
+        self.assertEqual(detections[0]['method'], 'custom_list')
+
+
+@unittest.skipIf(profanity is None, "better-profanity not installed")
+class AudioWordListPatternTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        profanity.load_censor_words()
+        cls.detector = audio_detector()
+        cls.detector.profanity_filter = profanity
+        cls.detector._compile_profanity_pattern()
+
+    def test_agrees_with_better_profanity(self):
+        texts = [
+            'you are a b1tch!',
+            'what the f*ck man',
+            'Hello there',
+            'sh!t happens',
+            'Assassin classes',
+            'D@mn it_all',
+            'fuck_you',
+            "that's a 5h1t idea",
+            ''
+        ]
+
+        for text in texts:
+            with self.subTest(text=text):
+                censored = self.detector.profanity_pattern.sub('****', text)
+                self.assertEqual(censored, profanity.censor(text))
+                self.assertEqual(censored != text, profanity.contains_profanity(text))
+
+    def test_detection_lists_hits(self):
+        detections = self.detector._detect_profanity_in_text('sh!t, what the f*ck')
+
+        self.assertEqual(len(detections), 1)
+        self.assertEqual(detections[0]['matched_words'], ['sh!t', 'f*ck'])
+        self.assertEqual(detections[0]['censored_text'], '****, what the ****')
+
+
+class TextProfanityTest(unittest.TestCase):
+
+    def reference(self, text: str, words: list) -> tuple:
+        """First listed word whose normalized form occurs in the normalized text"""
+        normalized_text = text_detector._normalize_text(text)
+        for word in words:
+            normalized = text_detector._normalize_text(word)
+            if normalized and normalized in normalized_text:
+                return True, word
+        return False, ""
+
+    def match(self, text: str, words: list, use_automaton: bool) -> tuple:
+        detector = text_detector_instance()
+        if use_automaton:
+            return detector._is_profanity(text, words)
+
+        with mock.patch.object(text_detector, 'ahocorasick', None):
+            return detector._is_profanity(text, words)
+
+    def test_normalize_text(self):
+        self.assertEqual(text_detector._normalize_text('Sh!t  Happens_2'), 'shthappens2')
+        self.assertEqual(text_detector._normalize_text('Ça Va'), 'çava')
+
+    def test_regex_fallback_matches_reference(self):
+        rng = random.Random(2)
+        for _ in range(200):
+            words = rng.sample(WORDS, rng.randint(1, len(WORDS)))
+            text = random_text(rng)
+            self.assertEqual(self.match(text, words, False), self.reference(text, words))
+
+    @unittest.skipIf(text_detector.ahocorasick is None, "pyahocorasick not installed")
+    def test_automaton_matches_reference(self):
+        rng = random.Random(3)
+        for _ in range(200):
+            words = rng.sample(WORDS, rng.randint(1, len(WORDS)))
+            text = random_text(rng)
+            self.assertEqual(self.match(text, words, True), self.reference(text, words))
+
+    def test_overlapping_words_report_earliest_listed(self):
+        for use_automaton in (False, text_detector.ahocorasick is not None):
+            with self.subTest(use_automaton=use_automaton):
+                self.assertEqual(
+                    self.match('BASTARDS', ['tar', 'bastard', 'ass'], use_automaton),
+                    (True, 'tar')
+                )
+
+    def test_words_without_letters_or_digits_never_match(self):
+        for use_automaton in (False, text_detector.ahocorasick is not None):
+            with self.subTest(use_automaton=use_automaton):
+                self.assertEqual(self.match('anything', ['!!!', ''], use_automaton), (False, ""))
+                self.assertEqual(self.match('anything', [], use_automaton), (False, ""))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+"""
+Tests for the session store, in-memory (no REDIS_HOST) and on Redis
+(fakeredis, when installed)
+"""
+
+import asyncio
+import unittest
+from unittest import mock
+
+from session_store import SessionStore
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+
+class SessionStoreScenarios:
+    """Scenarios shared by both backends; subclasses provide make_store()"""
+
+    async def make_store(self) -> SessionStore:
+        raise NotImplementedError
+
+    def run_with_store(self, scenario):
+        async def run():
+            store = await self.make_store()
+            try:
+                return await scenario(store)
+            finally:
+                await store.close()
+
+        return asyncio.run(run())
+
+    def test_session_lifecycle(self):
+        config = {'enable_text_detection': True, 'profanity_list': ['damn']}
+
+        async def scenario(store):
+            self.assertIsNone(await store.get_config('s1'))
+            self.assertFalse(await store.touch('s1'))
+
+            await store.create('s1', config)
+            self.assertEqual(await store.get_config('s1'), config)
+            self.assertTrue(await store.touch('s1'))
+
+            self.assertEqual([await store.incr_frame_count('s1') for _ in range(3)], [1, 2, 3])
+
+            # Re-creating a session resets its counter
+            await store.create('s1', config)
+            self.assertEqual(await store.incr_frame_count('s1'), 1)
+
+            self.assertTrue(await store.delete('s1'))
+            self.assertFalse(await store.delete('s1'))
+            self.assertIsNone(await store.get_config('s1'))
+
+        self.run_with_store(scenario)
+
+    def test_frames_after_delete_do_not_revive_the_session(self):
+        async def scenario(store):
+            await store.create('s1', {'n': 1})
+            await store.incr_frame_count('s1')
+            await store.delete('s1')
+
+            self.assertIsNone(await store.incr_frame_count('s1'))
+            self.assertFalse(await store.touch('s1'))
+            self.assertIsNone(await store.get_config('s1'))
+            self.assertFalse(await store.delete('s1'))
+
+        self.run_with_store(scenario)
+
+    def test_unknown_session_has_no_frame_counter(self):
+        async def scenario(store):
+            self.assertIsNone(await store.incr_frame_count('missing'))
+            self.assertFalse(await store.touch('missing'))
+
+        self.run_with_store(scenario)
+
+    def test_sessions_are_independent(self):
+        async def scenario(store):
+            await store.create('a', {'n': 1})
+            await store.create('b', {'n': 2})
+            await store.incr_frame_count('a')
+            await store.delete('a')
+
+            return await store.get_config('b'), await store.incr_frame_count('b')
+
+        self.assertEqual(self.run_with_store(scenario), ({'n': 2}, 1))
+
+
+class InMemorySessionStoreTest(SessionStoreScenarios, unittest.TestCase):
+
+    async def make_store(self) -> SessionStore:
+        store = SessionStore()
+        with mock.patch.dict('os.environ', {'REDIS_HOST': ''}):
+            await store.connect()
+
+        self.assertIsNone(store.redis)
+        return store
+
+    def test_counters_of_deleted_sessions_are_dropped(self):
+        async def scenario(store):
+            await store.create('s1', {})
+            await store.delete('s1')
+            await store.incr_frame_count('s1')
+            return store._frame_counts
+
+        self.assertEqual(self.run_with_store(scenario), {})
+
+
+@unittest.skipIf(fakeredis is None, "fakeredis not installed")
+class RedisSessionStoreTest(SessionStoreScenarios, unittest.TestCase):
+
+    async def make_store(self) -> SessionStore:
+        store = SessionStore()
+        store.redis = fakeredis.FakeAsyncRedis()
+        return store
+
+    def test_frames_refresh_the_ttl(self):
+        async def scenario(store):
+            await store.create('s1', {})
+            await store.redis.expire(store._key('s1'), 10)
+            await store.incr_frame_count('s1')
+            return await store.redis.ttl(store._key('s1'))
+
+        self.assertEqual(self.run_with_store(scenario), 3600)
+
+    def test_frames_after_delete_leave_no_key(self):
+        async def scenario(store):
+            await store.create('s1', {})
+            await store.delete('s1')
+            await store.incr_frame_count('s1')
+            return await store.redis.exists(store._key('s1'))
+
+        self.assertEqual(self.run_with_store(scenario), 0)
+
+    def test_leaked_counter_key_is_not_a_session(self):
+        async def scenario(store):
+            key = store._key('s1')
+            await store.redis.hset(key, 'frame_count', 7)
+
+            alive = await store.touch('s1')
+            return alive, await store.redis.ttl(key)
+
+        # Reported gone, and the TTL now bounds the stray key's lifetime
+        self.assertEqual(self.run_with_store(scenario), (False, 3600))
+
+
+if __name__ == '__main__':
+    unittest.main()
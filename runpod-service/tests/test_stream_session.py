@@ -0,0 +1,74 @@
+"""
+Tests for per-session frame bookkeeping in main.StreamSession
+"""
+
+import asyncio
+import unittest
+
+import main
+from main import ProcessingConfig, StreamSession
+
+
+class NextFrameTest(unittest.TestCase):
+
+    def setUp(self):
+        # In-memory store unless a test connected it to Redis
+        self.assertIsNone(main.session_store.redis)
+
+    def tearDown(self):
+        main.active_sessions.pop('s1', None)
+        asyncio.run(main.session_store.delete('s1'))
+
+    def test_frame_ids_start_at_one(self):
+        async def run():
+            await main.session_store.create('s1', ProcessingConfig().model_dump(mode='json'))
+            session = StreamSession('s1', ProcessingConfig())
+            return [await session.next_frame() for _ in range(3)], session.frame_count
+
+        self.assertEqual(asyncio.run(run()), ([1, 2, 3], 3))
+
+    def test_deleted_session_yields_no_frame_and_is_evicted(self):
+        async def run():
+            await main.session_store.create('s1', ProcessingConfig().model_dump(mode='json'))
+            session = StreamSession('s1', ProcessingConfig())
+            main.active_sessions['s1'] = session
+
+            await session.next_frame()
+            # Deleted through the shared store, e.g. by another worker
+            await main.session_store.delete('s1')
+
+            return await session.next_frame(), 's1' in main.active_sessions
+
+        self.assertEqual(asyncio.run(run()), (None, False))
+
+
+class KeyframeTest(unittest.TestCase):
+
+    def keyframes(self, session: StreamSession, frame_ids) -> list:
+        return [
+            frame_id for frame_id in frame_ids
+            if session.should_process_frame(frame_id) and session.is_keyframe(frame_id)
+        ]
+
+    def test_first_frame_and_every_stride_after_it(self):
+        session = StreamSession('s1', ProcessingConfig(detector_stride=5))
+        self.assertEqual(self.keyframes(session, range(1, 17)), [1, 6, 11, 16])
+
+    def test_stride_counts_processed_frames(self):
+        session = StreamSession('s1', ProcessingConfig(detector_stride=2, frame_sample_rate=3))
+        self.assertEqual(self.keyframes(session, range(1, 19)), [3, 9, 15])
+
+    def test_session_rebuilt_mid_stream_detects_first(self):
+        # Another worker processed frames 1-7; this worker's trackers are empty
+        session = StreamSession('s1', ProcessingConfig(detector_stride=5))
+        self.assertEqual(self.keyframes(session, range(8, 17)), [8, 11, 16])
+
+    def test_every_frame_without_tracking(self):
+        for config in (ProcessingConfig(enable_object_tracking=False), ProcessingConfig(detector_stride=1)):
+            with self.subTest(config=config):
+                session = StreamSession('s1', config)
+                self.assertEqual(self.keyframes(session, range(1, 6)), [1, 2, 3, 4, 5])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+"""
+Tests for the WebSocket wire format: the binary frame header and the
+pre-serialized text messages
+"""
+
+import json
+import struct
+import unittest
+
+import main
+
+
+class FrameHeaderTest(unittest.TestCase):
+
+    def test_header_is_15_bytes_little_endian(self):
+        header = main.FRAME_HEADER.pack(2 ** 40 + 7, 3, True, 123456)
+
+        self.assertEqual(main.FRAME_HEADER.size, 15)
+        self.assertEqual(header[:8], (2 ** 40 + 7).to_bytes(8, 'little'))
+        self.assertEqual(header[8:10], (3).to_bytes(2, 'little'))
+        self.assertEqual(header[10:11], b'\x01')
+        self.assertEqual(header[11:15], (123456).to_bytes(4, 'little'))
+
+    def test_client_parsing_round_trips(self):
+        jpeg = b'\xff\xd8 jpeg bytes \xff\xd9'
+        message = main.FRAME_HEADER.pack(42, 0, False, len(jpeg)) + jpeg
+
+        # As documented in the README for clients
+        frame_id, detection_count, has_blur, jpeg_len = main.FRAME_HEADER.unpack_from(message)
+
+        self.assertEqual((frame_id, detection_count, has_blur), (42, 0, 0))
+        self.assertEqual(message[main.FRAME_HEADER.size:main.FRAME_HEADER.size + jpeg_len], jpeg)
+
+    def test_out_of_range_fields_are_rejected(self):
+        with self.assertRaises(struct.error):
+            main.FRAME_HEADER.pack(0, 2 ** 16, False, 0)
+
+
+class TextMessageTemplateTest(unittest.TestCase):
+
+    def test_templates_match_send_json_output(self):
+        compact = {'separators': (',', ':')}
+
+        self.assertEqual(
+            main.SKIPPED_FRAME_TEMPLATE % 17,
+            json.dumps({'frame_id': 17, 'skipped': True}, **compact)
+        )
+        self.assertEqual(main.INVALID_FRAME_MESSAGE, json.dumps({'error': 'Invalid frame'}, **compact))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,6 +14,7 @@ import sys
 import time
 import numpy as np
 import cv2
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add runpod-service to path
@@ -105,8 +106,19 @@ def test_tensorrt_conversion(onnx_path):
         print(f"❌ Error during TensorRT conversion: {e}")
         return None
 
-def benchmark_inference(detector, test_image_path=None):
-    """Benchmark inference speed"""
+def _time_batch(run, num_iterations):
+    """Average wall time of run() in ms, after one warmup call"""
+    run()
+
+    start_time = time.time()
+    for _ in range(num_iterations):
+        results = run()
+    end_time = time.time()
+
+    return ((end_time - start_time) / num_iterations) * 1000, results
+
+def benchmark_inference(detector, test_image_path=None, batch_sizes=(1, 2, 4, 8)):
+    """Benchmark inference speed at each batch size, plus concurrent throughput"""
     print("\n⏱️  Benchmarking Inference Speed")
     print("=" * 60)
 
@@ -117,35 +129,62 @@ def benchmark_inference(detector, test_image_path=None):
         print("Creating synthetic test image (1280x720)...")
         img = np.random.randint(0, 255, (720, 1280, 3), dtype=np.uint8)
 
-    # Warmup
-    print("Warming up (3 iterations)...")
-    for _ in range(3):
-        _ = detector.detect(img)
+    # Batched calls where the detector supports them (NudeNet 3.x),
+    # otherwise the batch runs as concurrent single-image calls
+    has_batch = hasattr(detector, 'detect_batch')
+    print(f"Batch mode: {'detect_batch' if has_batch else 'concurrent detect'}")
 
-    # Benchmark
     num_iterations = 20
-    print(f"Running {num_iterations} iterations...")
+    latency = {}
 
-    start_time = time.time()
-    for _ in range(num_iterations):
-        results = detector.detect(img)
-    end_time = time.time()
+    print(f"Running {num_iterations} iterations per batch size...")
 
-    avg_latency_ms = ((end_time - start_time) / num_iterations) * 1000
-    fps = 1000 / avg_latency_ms
+    for batch_size in batch_sizes:
+        imgs = [img] * batch_size
+
+        if has_batch:
+            run = lambda: detector.detect_batch(imgs, batch_size=batch_size)
+        else:
+            pool = ThreadPoolExecutor(batch_size)
+            run = lambda: list(pool.map(detector.detect, imgs))
+
+        latency[batch_size], results = _time_batch(run, num_iterations)
+
+        if not has_batch:
+            pool.shutdown()
+
+    avg_latency_ms = latency[batch_sizes[0]]
 
     print(f"\n📊 Baseline Performance (NudeNet):")
-    print(f"   Average latency: {avg_latency_ms:.2f} ms")
-    print(f"   FPS: {fps:.2f}")
-    print(f"   Detections: {len(results)}")
+    print(f"   {'Batch':>5} {'Latency (ms)':>14} {'Per frame (ms)':>16} {'Throughput (FPS)':>18}")
+    for batch_size in batch_sizes:
+        print(
+            f"   {batch_size:>5} {latency[batch_size]:>14.2f} "
+            f"{latency[batch_size] / batch_size:>16.2f} "
+            f"{batch_size * 1000 / latency[batch_size]:>18.2f}"
+        )
+    print(f"   Detections: {len(results[0])}")
+
+    # End-to-end throughput with several callers, like concurrent streams
+    workers = max(batch_sizes)
+    num_frames = workers * num_iterations
+    with ThreadPoolExecutor(workers) as pool:
+        list(pool.map(detector.detect, [img] * workers))
+
+        start_time = time.time()
+        list(pool.map(detector.detect, [img] * num_frames))
+        concurrent_fps = num_frames / (time.time() - start_time)
+
+    print(f"   Concurrent ({workers} callers): {concurrent_fps:.2f} FPS")
 
     # Performance targets
     target_latency_ms = 30  # <30ms for live path
     verify_latency_ms = 200  # <200ms for verification
+    verify_batch = max(batch_sizes)
 
     print(f"\n🎯 Performance Targets:")
-    print(f"   Lane 1 (Publish): <30ms {'✅' if avg_latency_ms < target_latency_ms else '❌'}")
-    print(f"   Lane 2 (Verify): <200ms {'✅' if avg_latency_ms < verify_latency_ms else '❌'}")
+    print(f"   Lane 1 (Publish, batch 1): <30ms {'✅' if avg_latency_ms < target_latency_ms else '❌'}")
+    print(f"   Lane 2 (Verify, batch {verify_batch}): <200ms {'✅' if latency[verify_batch] < verify_latency_ms else '❌'}")
 
     if avg_latency_ms > verify_latency_ms:
         speedup_needed = avg_latency_ms / verify_latency_ms